@@ -5,4 +5,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theratrack.settings")
 
 from django.core.wsgi import get_wsgi_application
-app = get_wsgi_application()
\ No newline at end of file
+app = get_wsgi_application()
+
+from posture.utils.warmup import start_warmup
+start_warmup()
@@ -145,9 +145,10 @@ class WorkoutSessionAdmin(admin.ModelAdmin):
 # --------------------------
 @admin.register(AIModel)
 class AIModelAdmin(admin.ModelAdmin):
-    list_display = ('version', 'description', 'is_active', 'last_updated')
-    list_filter = ('is_active',)
-    search_fields = ('version',)
+    list_display = ('version', 'exercise', 'description', 'is_active', 'is_shadow', 'last_updated')
+    list_filter = ('is_active', 'is_shadow', 'exercise')
+    search_fields = ('version', 'exercise')
+    readonly_fields = ('artifact_path', 'checksum')
 
     def has_add_permission(self, request):
         return False
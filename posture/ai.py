@@ -1,13 +1,21 @@
-import torch
-import faiss
+import threading
+import time
 import numpy as np
-from transformers import AutoTokenizer, AutoModelForCausalLM
-from sentence_transformers import SentenceTransformer
 from functools import lru_cache
+from django.conf import settings
+
+# torch, transformers, sentence_transformers and faiss are imported when the
+# models load, so processes that never chat do not pay for them
 
 MODEL_NAME = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
 EMBED_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
+# "startup": load in the background when the server starts,
+# "lazy": on the first chat message, "off": always use fallback replies
+CHATBOT_LOAD = getattr(settings, "CHATBOT_LOAD", "lazy")
+# Seconds after a failed load before a chat message may start another one
+CHATBOT_RETRY_SECONDS = getattr(settings, "CHATBOT_RETRY_SECONDS", 300)
+
 # ---------------- Global ----------------
 _tokenizer = None
 _model = None
@@ -18,6 +26,10 @@ _documents = None
 
 # ---------------- Load Models ----------------
 def load_models():
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    from sentence_transformers import SentenceTransformer
+
     global _tokenizer, _model, _device, _embedder
     if _model is None:
         _tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
@@ -68,6 +80,8 @@ def load_documents():
 
 # ---------------- Build FAISS Index ----------------
 def build_index():
+    import faiss
+
     global _index
     if _index is None:
         _, _, _, embedder = load_models()
@@ -118,6 +132,13 @@ def generate_response(user_message: str, conversation_history=None) -> str:
         return "I'm doing great 😊 How can I help you today?"
 
     # ---------------- Load Model ----------------
+    # quick tip while the models load in the background
+    if not models_ready():
+        start_loading()
+        return fallback_response(user_lower)
+
+    import torch
+
     tokenizer, model, device, _ = load_models()
 
     # ---------------- Context ----------------
@@ -181,6 +202,54 @@ Answer:
 
     return response
 
-# ---------------- Initialize ----------------
-load_models()
-build_index()
\ No newline at end of file
+# ---------------- Background Loading ----------------
+_status = {"state": "idle", "error": None, "seconds": None}
+_status_lock = threading.Lock()
+_failed_at = None
+
+
+def chatbot_status():
+    """idle / loading / ready / failed / off, with the load time or error."""
+    if CHATBOT_LOAD == "off":
+        return {"state": "off", "error": None, "seconds": None}
+    with _status_lock:
+        return dict(_status)
+
+
+def models_ready():
+    return _status["state"] == "ready"
+
+
+def _load_all():
+    global _failed_at
+    start = time.perf_counter()
+    try:
+        load_models()
+        build_index()
+    except Exception as e:
+        print("THERABOT LOAD ERROR:", e, flush=True)
+        with _status_lock:
+            _status.update(state="failed", error=str(e))
+            _failed_at = time.monotonic()
+    else:
+        with _status_lock:
+            _status.update(state="ready", seconds=round(time.perf_counter() - start, 1))
+
+
+def start_loading():
+    """
+    Load TinyLlama, MiniLM and the FAISS index in a background thread, once;
+    a failed load is retried by the first call CHATBOT_RETRY_SECONDS later.
+    """
+    if CHATBOT_LOAD == "off":
+        return
+    with _status_lock:
+        state = _status["state"]
+        if state == "failed":
+            # e.g. the model download timed out: try again, but not on every message
+            if time.monotonic() - _failed_at < CHATBOT_RETRY_SECONDS:
+                return
+        elif state != "idle":
+            return
+        _status["state"] = "loading"
+    threading.Thread(target=_load_all, name="chatbot-load", daemon=True).start()
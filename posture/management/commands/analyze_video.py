@@ -0,0 +1,60 @@
+# posture/management/commands/analyze_video.py
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from posture.models import Exercise
+from posture.utils.video import VIDEO_ANALYSIS_FPS, save_video_session, score_video
+
+
+class Command(BaseCommand):
+    help = "Score a recorded workout video and save it as a completed session"
+
+    def add_arguments(self, parser):
+        parser.add_argument("video", help="Path to the video file")
+        parser.add_argument("--user", required=True, help="Username the session belongs to")
+        parser.add_argument("--exercise", required=True, help="Exercise name or id")
+        parser.add_argument("--fps", type=float, default=VIDEO_ANALYSIS_FPS, help="Frames per second to analyse")
+        parser.add_argument("--workers", type=int, default=None, help="Pose worker processes")
+        parser.add_argument("--dry-run", action="store_true", help="Score without saving")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["user"]).first()
+        if not user:
+            raise CommandError(f"User {options['user']} not found")
+
+        exercise = self.get_exercise(options["exercise"])
+
+        try:
+            result = score_video(
+                options["video"],
+                exercise.exercise_name.lower(),
+                target_fps=options["fps"],
+                max_workers=options["workers"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for rep in result["reps"]:
+            self.stdout.write(
+                f"Rep {rep['count_number']} at {rep['time']:.1f}s - "
+                f"{rep['posture_accuracy']}% - {rep['feedback_text']}"
+            )
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"{len(result['reps'])} reps found (not saved)."))
+            return
+
+        session = save_video_session(user, exercise, result)
+        self.stdout.write(self.style.SUCCESS(
+            f"Session {session.session_id} saved with {len(result['reps'])} reps."
+        ))
+
+    def get_exercise(self, value):
+        if value.isdigit():
+            exercise = Exercise.objects.filter(pk=int(value)).first()
+        else:
+            exercise = Exercise.objects.filter(exercise_name__iexact=value.strip()).first()
+        if not exercise:
+            raise CommandError(f"Exercise {value} not found")
+        return exercise
@@ -0,0 +1,55 @@
+# posture/management/commands/export_forests.py
+
+import glob
+import os
+
+import joblib
+from django.core.management.base import BaseCommand
+
+from posture.models import AIModel
+from posture.utils.forest import export_forest, flat_path, is_forest
+from posture.utils.model_registry import MODEL_DIR, file_checksum, registered_artifact
+
+
+class Command(BaseCommand):
+    help = "Flatten the random forests in ml_models/ into arrays for fast inference"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Re-export forests that are already up to date")
+
+    def handle(self, *args, **options):
+        for artifact in sorted(glob.glob(os.path.join(MODEL_DIR, "*_model_*.pkl"))):
+            name = os.path.basename(artifact)
+            exported = flat_path(artifact)
+            if not options["force"] and self.up_to_date(artifact, exported):
+                # exports made before checksums were recorded
+                self.register(artifact, exported)
+                continue
+
+            bundle = joblib.load(artifact)
+            model = bundle.get("model") if isinstance(bundle, dict) else None
+            if not is_forest(model):
+                self.stdout.write(f"Skipping {name} (not a forest bundle)")
+                continue
+
+            export_forest(model, artifact, bundle.get("features"))
+            self.register(artifact, exported)
+            self.stdout.write(self.style.SUCCESS(f"Exported {os.path.basename(exported)}"))
+
+    def register(self, artifact, exported):
+        """Record the export's checksum on the AIModel rows serving ``artifact``."""
+        checksum = file_checksum(exported)
+        for row in AIModel.objects.exclude(exercise=None):
+            path = registered_artifact(row.exercise, row.version, row.artifact_path)
+            if os.path.normpath(path) != os.path.normpath(artifact):
+                continue
+            if row.export_checksum != checksum:
+                row.export_checksum = checksum
+                # bumps last_updated, so running workers reload the model
+                row.save(update_fields=["export_checksum", "last_updated"])
+
+    def up_to_date(self, artifact, exported):
+        if not os.path.exists(exported) or os.path.getmtime(exported) < os.path.getmtime(artifact):
+            return False
+        # exports written before they carried the feature list cannot be served alone
+        return "features" in joblib.load(exported, mmap_mode="r")
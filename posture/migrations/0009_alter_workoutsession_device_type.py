@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posture', '0008_feedback_repetition'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workoutsession',
+            name='device_type',
+            field=models.CharField(choices=[('Webcam', 'Webcam'), ('Mobile', 'Mobile'), ('Video', 'Video')], max_length=50),
+        ),
+    ]
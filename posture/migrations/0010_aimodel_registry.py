@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posture', '0009_alter_workoutsession_device_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aimodel',
+            name='artifact_path',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='checksum',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='aimodel',
+            index=models.Index(fields=['exercise', 'is_active'], name='aimodel_exercise_active_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posture', '0010_aimodel_registry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aimodel',
+            name='is_shadow',
+            field=models.BooleanField(default=False),
+        ),
+    ]
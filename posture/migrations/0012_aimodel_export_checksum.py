@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posture', '0011_aimodel_is_shadow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aimodel',
+            name='export_checksum',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -58,7 +58,7 @@ class WorkoutSession(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField(null=True, blank=True)
     duration = models.DurationField(null=True, blank=True)
-    device_type = models.CharField(max_length=50, choices=[('Webcam', 'Webcam'), ('Mobile', 'Mobile')])
+    device_type = models.CharField(max_length=50, choices=[('Webcam', 'Webcam'), ('Mobile', 'Mobile'), ('Video', 'Video')])
     status = models.CharField(max_length=50, choices=[('Active', 'Active'), ('Completed', 'Completed')])
 
     def __str__(self):
@@ -87,6 +87,18 @@ class AIModel(models.Model):
     accuracy = models.FloatField()
     last_updated = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=False)
+    # candidate scored next to the active model on sampled traffic
+    is_shadow = models.BooleanField(default=False)
+    # pickle written by train_model.py, relative to the project root
+    artifact_path = models.CharField(max_length=255, blank=True, default="")
+    checksum = models.CharField(max_length=64, blank=True, default="")
+    # SHA-256 of the exported forest (<artifact>.flat.joblib) served instead of the pickle
+    export_checksum = models.CharField(max_length=64, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["exercise", "is_active"], name="aimodel_exercise_active_idx"),
+        ]
 
     def __str__(self):
         return f"AI Model v{self.version}"
@@ -0,0 +1,31 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from posture.utils.landmarks import MSGPACK_MEDIA_TYPE, PACKED_MEDIA_TYPES
+
+
+# ---------------- Landmark Renderers ----------------
+class _LandmarkRenderer(BaseRenderer):
+    """
+    Lets DRF content negotiation accept the compact landmark media types.
+    The pose views build those bodies themselves; this renderer is only
+    used for error responses, which stay JSON.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode()
+
+
+def _renderer(media_type):
+    return type(
+        "LandmarkRenderer",
+        (_LandmarkRenderer,),
+        {"media_type": media_type, "format": media_type.rsplit("/", 1)[-1]},
+    )
+
+
+POSE_RENDERERS = [JSONRenderer] + [
+    _renderer(media_type) for media_type in [*PACKED_MEDIA_TYPES, MSGPACK_MEDIA_TYPE]
+]
@@ -0,0 +1,153 @@
+import json
+import uuid
+from urllib.parse import parse_qs
+
+import cv2
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from posture.utils.frames import FrameDecodeError, decode_data_url, request_timestamp
+from posture.utils.landmarks import array_to_list
+from posture.utils.pose_pipeline import finish_frame, prepare_frame, score_frame
+from posture.utils.pose_pool import PosePoolTimeout, get_pose_pool
+from posture.utils.reps import session_rep_counter
+from posture.utils.sessions import PoseSessionState
+
+POSE_STREAM_PATH = "/ws/pose/"
+
+# close codes sent to the client
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+CLOSE_TRY_AGAIN = 1013
+
+
+# ---------------- Auth ----------------
+def _authenticate(scope):
+    query = parse_qs(scope.get("query_string", b"").decode())
+    token = (query.get("token") or [None])[0]
+    if not token:
+        return None
+
+    auth = JWTAuthentication()
+    try:
+        validated = auth.get_validated_token(token)
+        user = auth.get_user(validated)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        # AuthenticationFailed: token of a deleted or inactive user
+        return None
+    return user if user.is_active else None
+
+
+# ---------------- Frame Handling ----------------
+def _read_message(message):
+    """Binary messages are raw JPEG/WebP bytes, text messages are JSON."""
+    if message.get("bytes") is not None:
+        return message["bytes"], {}
+
+    payload = json.loads(message.get("text") or "{}")
+    if not isinstance(payload, dict):
+        raise FrameDecodeError("Text messages must be a JSON object")
+    return decode_data_url(payload.get("frame")), payload
+
+
+def _analyze(pool, slot, buffer, state, exercise, timestamp=None):
+    """Landmarks, features and verdict for one frame, like analyze_and_predict_api."""
+    prev_landmarks = state.landmarks
+    rgb, roi, frame_shape = prepare_frame(buffer, state)
+
+    reused = rgb is None
+    if reused:
+        landmarks = state.landmarks
+    else:
+        with pool.timed(slot):
+            results = slot.pose.process(rgb)
+        landmarks = finish_frame(results, roi, state)
+
+    if landmarks is None:
+        return {"landmarks": None, "reused": reused, "features": None, "label": "unknown", "prob": 0}
+
+    counter = session_rep_counter(state, exercise)
+    features, verdict, rep = score_frame(exercise, landmarks, frame_shape, prev_landmarks,
+                                         counter, timestamp)
+    return {"landmarks": array_to_list(landmarks), "reused": reused, "features": features,
+            "rep": rep, **verdict}
+
+
+# ---------------- Pose Stream ----------------
+async def pose_stream(scope, receive, send):
+    """
+    Live workout channel: frames in, landmarks out on one connection.
+
+    Connect to ``/ws/pose/?token=<access token>&exercise=<name>``. The
+    exercise sets the lowest model complexity allowed and picks the
+    classifier: every reply carries the frame's landmarks, angle features,
+    verdict and the connection's running rep count. JSON messages may add a
+    ``timestamp`` (ms) for the rep timings. The connection keeps a
+    Pose instance checked out of the worker pool for as long as its model
+    tier fits the latency budget, so MediaPipe stays in tracking mode between frames and skips full detection on most
+    of them. Frames are processed in order, one at a time.
+    """
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+
+    user = await sync_to_async(_authenticate)(scope)
+    if user is None:
+        await send({"type": "websocket.close", "code": CLOSE_UNAUTHORIZED})
+        return
+
+    pool = get_pose_pool()
+    session_key = f"ws:{user.pk}:{uuid.uuid4().hex}"
+    query = parse_qs(scope.get("query_string", b"").decode())
+    exercise = (query.get("exercise") or [""])[0].lower().strip()
+    checkout = sync_to_async(pool.checkout, thread_sensitive=False)
+    try:
+        slot = await checkout(session_key, exercise=exercise)
+    except PosePoolTimeout:
+        await send({"type": "websocket.close", "code": CLOSE_TRY_AGAIN})
+        return
+
+    analyze = sync_to_async(_analyze, thread_sensitive=False)
+    state = PoseSessionState()
+
+    try:
+        await send({"type": "websocket.accept"})
+
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message["type"] != "websocket.receive":
+                continue
+
+            # move to a lighter (or heavier) model when the latency budget says so
+            if pool.select(exercise, session_key) != slot.complexity:
+                pool.checkin(slot)
+                try:
+                    slot = await checkout(session_key, exercise=exercise)
+                except PosePoolTimeout:
+                    slot = None
+                    await send({"type": "websocket.close", "code": CLOSE_TRY_AGAIN})
+                    break
+
+            payload = {}
+            try:
+                buffer, payload = _read_message(message)
+                with pool.load.track():
+                    response = await analyze(pool, slot, buffer, state, exercise,
+                                             request_timestamp(payload))
+            except (FrameDecodeError, ValueError, cv2.error) as e:
+                # one bad frame gets an error reply; the stream stays open
+                response = {"error": str(e)}
+
+            response["backpressure"] = pool.load.advice()
+
+            if "seq" in payload:
+                response["seq"] = payload["seq"]
+            await send({"type": "websocket.send", "text": json.dumps(response)})
+    finally:
+        if slot is not None:
+            pool.checkin(slot)
+        pool.release_session(session_key)
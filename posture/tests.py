@@ -1,3 +1,319 @@
-from django.test import TestCase
+import glob
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
 
-# Create your tests here.
+import joblib
+import numpy as np
+import pandas as pd
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.test import SimpleTestCase, TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from posture.models import Exercise, WorkoutSession
+from posture.streaming import _read_message
+from posture.utils.classifier import BASE_FEATURES, ENGINEERED_FEATURES, FeaturePlan
+from posture.utils.forest import FlatForest, export_forest, is_forest, load_bundle, sklearn_model
+from posture.utils.frames import FrameDecodeError, decode_data_url
+from posture.utils.model_registry import BASE_DIR, MODEL_DIR, file_checksum
+from posture.utils import pose_workers
+from posture.utils.pose_pool import PosePool, PosePoolTimeout, pose_session_key
+from posture.utils.sessions import get_pose_sessions
+
+# Bundles trained by train_model.py that are checked into ml_models/
+TRAINED_BUNDLES = sorted(glob.glob(os.path.join(MODEL_DIR, "*_1505.pkl")))
+
+
+def training_frame(rows=500, seed=0):
+    """
+    Angles like the ones train_model.py sees: dataset.csv rows plus random
+    ones, with the engineered columns built exactly as train_model.py does.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.uniform(0, 180, size=(rows, len(BASE_FEATURES))), columns=BASE_FEATURES)
+
+    dataset = os.path.join(BASE_DIR, "dataset.csv")
+    if os.path.exists(dataset):
+        recorded = pd.read_csv(dataset)[["kneeAngle", "hipAngle", "elbowAngle"]]
+        recorded["legRaiseAngle"] = rng.uniform(0, 180, size=len(recorded))
+        df = pd.concat([df, recorded[list(BASE_FEATURES)]], ignore_index=True)
+
+    # ---------------- FEATURE ENGINEERING (train_model.py) ----------------
+    df["knee_hip_diff"] = abs(df["kneeAngle"] - df["hipAngle"])
+    df["hip_elbow_diff"] = abs(df["hipAngle"] - df["elbowAngle"])
+    df["knee_elbow_diff"] = abs(df["kneeAngle"] - df["elbowAngle"])
+
+    df["body_balance"] = (df["kneeAngle"] + df["hipAngle"]) / 2
+    df["posture_stability"] = (df["kneeAngle"] + df["hipAngle"] + df["elbowAngle"]) / 3
+
+    df["knee_depth"] = 180 - df["kneeAngle"]
+    df["hip_opening"] = df["hipAngle"] - 90
+    df["arm_fold_ratio"] = df["elbowAngle"] / 180
+    return df
+
+
+class FeaturePlanTests(SimpleTestCase):
+    def setUp(self):
+        self.df = training_frame()
+        self.rows = self.df[list(BASE_FEATURES)].to_dict("records")
+
+    def test_matrix_matches_pandas_engineering(self):
+        features = list(BASE_FEATURES) + list(ENGINEERED_FEATURES)
+        expected = self.df[features].to_numpy(dtype=np.float64)
+
+        np.testing.assert_array_equal(FeaturePlan(features).matrix(self.rows), expected)
+
+    def test_row_matches_pandas_engineering(self):
+        features = list(BASE_FEATURES) + list(ENGINEERED_FEATURES)
+        plan = FeaturePlan(features)
+        expected = self.df[features].to_numpy(dtype=np.float64)
+
+        for i in range(0, len(self.rows), 37):
+            np.testing.assert_array_equal(plan.row(self.rows[i])[0], expected[i])
+
+    def test_unknown_features_are_zero(self):
+        out = FeaturePlan(("kneeAngle", "not_a_feature")).matrix(self.rows[:3])
+        np.testing.assert_array_equal(out[:, 1], np.zeros(3))
+
+
+class FlatForestTests(SimpleTestCase):
+    def setUp(self):
+        if not TRAINED_BUNDLES:
+            self.skipTest("no trained bundles in ml_models/")
+        self.df = training_frame()
+        self.rows = self.df[list(BASE_FEATURES)].to_dict("records")
+
+    def test_predict_proba_matches_sklearn_exactly(self):
+        for artifact in TRAINED_BUNDLES:
+            bundle = joblib.load(artifact)
+            model = bundle["model"]
+            if not is_forest(model):
+                continue
+
+            with self.subTest(artifact=os.path.basename(artifact)):
+                X = FeaturePlan(bundle["features"]).matrix(self.rows)
+                flat = FlatForest.from_model(model)
+
+                np.testing.assert_array_equal(flat.predict_proba(X), model.predict_proba(X))
+                np.testing.assert_array_equal(flat.predict(X), model.predict(X))
+
+    def test_export_served_memory_mapped(self):
+        bundle = joblib.load(TRAINED_BUNDLES[0])
+        model = bundle["model"]
+        X = FeaturePlan(bundle["features"]).matrix(self.rows)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            artifact = os.path.join(tmp, os.path.basename(TRAINED_BUNDLES[0]))
+            shutil.copyfile(TRAINED_BUNDLES[0], artifact)
+            export_forest(model, artifact, bundle["features"])
+
+            with mock.patch("posture.utils.forest.CLASSIFIER_MMAP", True):
+                served = load_bundle(artifact)
+
+            self.assertNotIn("model", served)
+            self.assertEqual(list(served["features"]), list(bundle["features"]))
+            self.assertIsInstance(served["flat"].threshold, np.memmap)
+            np.testing.assert_array_equal(served["flat"].predict_proba(X), model.predict_proba(X))
+
+            # large batches unpickle the sklearn model on demand
+            self.assertIsNotNone(sklearn_model(served))
+            np.testing.assert_array_equal(served["model"].predict_proba(X), model.predict_proba(X))
+
+    def test_export_checksum_is_verified_without_pickle_checksum(self):
+        bundle = joblib.load(TRAINED_BUNDLES[0])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            artifact = os.path.join(tmp, os.path.basename(TRAINED_BUNDLES[0]))
+            shutil.copyfile(TRAINED_BUNDLES[0], artifact)
+            exported = export_forest(bundle["model"], artifact, bundle["features"])
+
+            served = load_bundle(artifact, export_checksum=file_checksum(exported))
+            self.assertNotIn("model", served)
+
+            # a tampered export falls back to the pickle
+            served = load_bundle(artifact, export_checksum="0" * 64)
+            self.assertIn("model", served)
+
+
+class FakePose:
+    def __init__(self, complexity):
+        self.complexity = complexity
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+    def process(self, image):
+        return None
+
+    def close(self):
+        pass
+
+
+class PosePoolTests(SimpleTestCase):
+    def test_busy_session_waits_for_its_own_slot(self):
+        pool = PosePool(size=2, factory=FakePose)
+        first = pool.checkout("s1")
+
+        timer = threading.Timer(0.05, pool.checkin, args=(first,))
+        timer.start()
+        second = pool.checkout("s1", timeout=2)
+        timer.join()
+
+        self.assertIs(second, first)
+        self.assertEqual(len(pool._slots), 1)
+
+    def test_busy_session_times_out_instead_of_growing(self):
+        pool = PosePool(size=2, factory=FakePose)
+        pool.checkout("s1")
+
+        with self.assertRaises(PosePoolTimeout):
+            pool.checkout("s1", timeout=0.05)
+        self.assertEqual(len(pool._slots), 1)
+
+    def test_repin_keeps_mapping_of_other_slot(self):
+        pool = PosePool(size=2, factory=FakePose)
+        stale, current = pool.checkout("s1"), pool.checkout("s2")
+        pool.checkin(stale)
+        pool.checkin(current)
+        # both slots labelled "s1", the mapping pointing at the newer one
+        pool.release_session("s2")
+        current.session_key = "s1"
+        pool._sessions["s1"] = current
+
+        with pool._cond:
+            pool._pin(stale, "s3")
+
+        self.assertIs(pool._sessions["s1"], current)
+        self.assertIs(pool._sessions["s3"], stale)
+        pool.release_session("s1")
+        self.assertIsNone(current.session_key)
+
+    def test_slot_is_reset_when_owner_changes(self):
+        pool = PosePool(size=1, factory=FakePose)
+        slot = pool.checkout("s1")
+        pool.checkin(slot)
+        self.assertIs(pool.checkout("s1"), slot)
+        pool.checkin(slot)
+        self.assertEqual(slot.pose.resets, 0)
+
+        pool.checkout("s2")
+        self.assertEqual(slot.pose.resets, 1)
+
+
+class PoseWorkersTests(SimpleTestCase):
+    def test_broken_pool_is_replaced_and_work_retried(self):
+        broken, fresh = mock.Mock(), mock.Mock()
+
+        def work(executor):
+            if executor is broken:
+                raise BrokenProcessPool("worker died")
+            return "done"
+
+        with mock.patch.object(pose_workers, "_executor", broken), \
+                mock.patch.object(pose_workers, "ProcessPoolExecutor", return_value=fresh):
+            self.assertEqual(pose_workers.run_on_pose_executor(work), "done")
+            self.assertIs(pose_workers._executor, fresh)
+
+        broken.shutdown.assert_called_once()
+
+
+class DecodeDataUrlTests(SimpleTestCase):
+    def test_non_string_frame_is_a_frame_error(self):
+        for frame in (12, [1, 2], {"a": 1}, True):
+            with self.subTest(frame=frame), self.assertRaises(FrameDecodeError):
+                decode_data_url(frame)
+
+    def test_data_url_prefix_is_stripped(self):
+        self.assertEqual(decode_data_url("data:image/jpeg;base64,AAEC"), b"\x00\x01\x02")
+
+
+class PoseStreamMessageTests(SimpleTestCase):
+    def test_non_object_json_is_a_frame_error(self):
+        for text in ("[1, 2]", '"x"', "3", "null"):
+            with self.subTest(text=text), self.assertRaises(FrameDecodeError):
+                _read_message({"type": "websocket.receive", "text": text})
+
+
+class ShadowStatsApiTests(TestCase):
+    def test_staff_session_gets_stats(self):
+        staff = User.objects.create_user("admin", password="pw", is_staff=True)
+        self.client.force_login(staff)
+
+        response = self.client.get("/api/shadow_stats/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("exercises", response.json())
+
+    def test_regular_user_is_refused(self):
+        self.client.force_login(User.objects.create_user("user", password="pw"))
+
+        self.assertEqual(self.client.get("/api/shadow_stats/").status_code, 403)
+
+
+class PredictBatchApiTests(TestCase):
+    def test_bad_feature_value_names_the_row(self):
+        rows = [
+            {"kneeAngle": 90, "hipAngle": 100, "elbowAngle": 120, "legRaiseAngle": 10},
+            {"kneeAngle": None, "hipAngle": 100, "elbowAngle": 120, "legRaiseAngle": 10},
+        ]
+
+        response = self.client.post(
+            "/api/predict_posture_batch/", {"exercise": "squat", "rows": rows}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("rows[1]", response.json()["error"])
+
+
+class ServerRepsApiTests(TestCase):
+    # two frames down past 120 degrees start a squat, two up past 160 finish it
+    SQUAT = [{"kneeAngle": a} for a in (100, 100, 170, 170)]
+
+    def setUp(self):
+        self.user = User.objects.create_user("patient", password="pw")
+        exercise = Exercise.objects.create(
+            exercise_name="Squats", description="", target_muscle="legs", difficulty_level="Beginner"
+        )
+        self.session = WorkoutSession.objects.create(
+            user=self.user, exercise=exercise, start_time=timezone.now(), device_type="Webcam", status="Active"
+        )
+        self.key = pose_session_key(self.user, self.session.session_id)
+        self.auth = f"Bearer {AccessToken.for_user(self.user)}"
+
+    def tearDown(self):
+        get_pose_sessions().pop(self.key)
+
+    def post(self, url, body):
+        return self.client.post(url, body, content_type="application/json", HTTP_AUTHORIZATION=self.auth)
+
+    def stream(self, samples):
+        return self.post(
+            "/api/rep_stream/", {"session_id": self.session.session_id, "exercise": "squats", "samples": samples}
+        )
+
+    def test_bad_sample_leaves_counter_untouched(self):
+        response = self.stream(self.SQUAT + [{"kneeAngle": "deep"}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(get_pose_sessions().peek(self.key).rep_counter.count, 0)
+
+    def test_retried_save_does_not_duplicate_reps(self):
+        self.assertEqual(self.stream(self.SQUAT).json()["rep_count"], 1)
+        body = {"session_id": self.session.session_id, "server_reps": True}
+
+        for _ in range(2):
+            response = self.post("/api/save_repetitions/", body)
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.session.repetitions.count(), 1)
+
+        self.stream(self.SQUAT)
+        self.post("/api/save_repetitions/", body)
+        self.assertEqual(
+            list(self.session.repetitions.order_by("count_number").values_list("count_number", flat=True)), [1, 2]
+        )
@@ -0,0 +1,84 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Inference latency the service aims for; above it clients are slowed down
+POSE_TARGET_LATENCY_MS = getattr(settings, "POSE_TARGET_LATENCY_MS", 60)
+# Frame interval recommended when the worker is not under pressure, and the cap
+POSE_FRAME_INTERVAL_MS = getattr(settings, "POSE_FRAME_INTERVAL_MS", 100)
+POSE_MAX_FRAME_INTERVAL_MS = getattr(settings, "POSE_MAX_FRAME_INTERVAL_MS", 1000)
+POSE_MAX_INFERENCE_SIZE = getattr(settings, "POSE_MAX_INFERENCE_SIZE", 640)
+
+# load -> longest side (px) clients should send
+RESOLUTION_STEPS = ((1.5, 320), (1.0, 480))
+COMFORTABLE_LOAD = 0.7
+LATENCY_SMOOTHING = 0.2
+
+
+# ---------------- Load Monitor ----------------
+class LoadMonitor:
+    """
+    Tracks inference latency (EWMA) and in-flight depth for one worker and
+    turns them into a recommended next-frame interval and resolution, so
+    clients back off before requests start queueing.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = max(1, capacity)
+        self.in_flight = 0
+        self.latency_ms = 0.0
+        self.updated = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self):
+        """Count a request as in flight, including time spent queueing."""
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    @contextmanager
+    def timed(self):
+        """Measure one inference call."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record((time.perf_counter() - start) * 1000)
+
+    def record(self, elapsed_ms):
+        with self._lock:
+            self.updated = time.monotonic()
+            if self.latency_ms:
+                self.latency_ms += LATENCY_SMOOTHING * (elapsed_ms - self.latency_ms)
+            else:
+                self.latency_ms = elapsed_ms
+
+    def load(self):
+        return max(self.in_flight / self.capacity, self.latency_ms / POSE_TARGET_LATENCY_MS)
+
+    def advice(self):
+        load = self.load()
+
+        interval = POSE_FRAME_INTERVAL_MS
+        if load > COMFORTABLE_LOAD:
+            interval = min(POSE_MAX_FRAME_INTERVAL_MS, POSE_FRAME_INTERVAL_MS * load / COMFORTABLE_LOAD)
+
+        resolution = POSE_MAX_INFERENCE_SIZE
+        for threshold, size in RESOLUTION_STEPS:
+            if load > threshold:
+                resolution = min(resolution, size) if resolution else size
+                break
+
+        return {
+            "next_frame_ms": int(interval),
+            "max_resolution": resolution,
+            "in_flight": self.in_flight,
+            "latency_ms": round(self.latency_ms, 1),
+        }
@@ -0,0 +1,308 @@
+import os
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+from posture.utils.forest import CLASSIFIER_FLAT_MAX_ROWS, ChecksumMismatch, load_bundle, sklearn_model
+from posture.utils.model_registry import get_model_registry
+from posture.utils.prediction_cache import get_prediction_cache
+
+# Seconds a cached model is trusted before its file and AIModel row are re-checked
+MODEL_CACHE_CHECK_SECONDS = getattr(settings, "MODEL_CACHE_CHECK_SECONDS", 5)
+
+
+# ---------------- FEATURE ENGINEERING ----------------
+BASE_FEATURES = ("kneeAngle", "hipAngle", "elbowAngle", "legRaiseAngle")
+
+# Same expressions, in the same operation order, as train_model.py, so
+# float64 results match its pandas columns bit for bit.
+# column -> (base angles it reads, function of those as floats or arrays)
+ENGINEERED_FEATURES = {
+    "knee_hip_diff": (("kneeAngle", "hipAngle"), lambda c: abs(c["kneeAngle"] - c["hipAngle"])),
+    "hip_elbow_diff": (("hipAngle", "elbowAngle"), lambda c: abs(c["hipAngle"] - c["elbowAngle"])),
+    "knee_elbow_diff": (("kneeAngle", "elbowAngle"), lambda c: abs(c["kneeAngle"] - c["elbowAngle"])),
+
+    "body_balance": (("kneeAngle", "hipAngle"), lambda c: (c["kneeAngle"] + c["hipAngle"]) / 2),
+    "posture_stability": (
+        ("kneeAngle", "hipAngle", "elbowAngle"),
+        lambda c: (c["kneeAngle"] + c["hipAngle"] + c["elbowAngle"]) / 3,
+    ),
+
+    "knee_depth": (("kneeAngle",), lambda c: 180 - c["kneeAngle"]),
+    "hip_opening": (("hipAngle",), lambda c: c["hipAngle"] - 90),
+    "arm_fold_ratio": (("elbowAngle",), lambda c: c["elbowAngle"] / 180),
+}
+
+
+class FeaturePlan:
+    """
+    Model input builder compiled from a bundle's ``features`` list.
+
+    Only the base angles and engineered columns the model uses are
+    computed, straight into a float64 array in the model's column order.
+    Names the engineering does not know are filled with 0, as before.
+    """
+
+    def __init__(self, feature_list):
+        self.features = tuple(feature_list)
+        self._steps = []
+        needed = set()
+        for i, name in enumerate(self.features):
+            if name in BASE_FEATURES:
+                self._steps.append((i, lambda c, name=name: c[name]))
+                needed.add(name)
+            elif name in ENGINEERED_FEATURES:
+                inputs, fn = ENGINEERED_FEATURES[name]
+                self._steps.append((i, fn))
+                needed.update(inputs)
+        self.inputs = tuple(b for b in BASE_FEATURES if b in needed)
+
+    def row(self, features):
+        """(1, n) input for one feature dict."""
+        columns = {name: float(features.get(name, 0)) for name in self.inputs}
+        out = np.zeros((1, len(self.features)))
+        for i, fn in self._steps:
+            out[0, i] = fn(columns)
+        return out
+
+    def matrix(self, feature_rows):
+        """(rows, n) input for many feature dicts, computed column-wise."""
+        columns = {
+            name: np.fromiter((float(f.get(name, 0)) for f in feature_rows), dtype=np.float64, count=len(feature_rows))
+            for name in self.inputs
+        }
+        out = np.zeros((len(feature_rows), len(self.features)))
+        for i, fn in self._steps:
+            out[:, i] = fn(columns)
+        return out
+
+
+@lru_cache(maxsize=64)
+def feature_plan(feature_list):
+    return FeaturePlan(feature_list)
+
+
+# ---------------- MODEL CACHE ----------------
+class _CachedModel:
+    __slots__ = ("path", "stamp", "bundle", "checked_at")
+
+    def __init__(self, path, stamp, bundle):
+        self.path = path
+        self.stamp = stamp
+        self.bundle = bundle
+        self.checked_at = time.monotonic()
+
+
+class ModelCache:
+    """
+    Unpickled classifier bundles of this process, keyed by exercise.
+
+    An entry is reused until the registry resolves the exercise to another
+    artifact or AIModel row, or the pickle's mtime changes; those are
+    re-checked at most every ``check_seconds``. Concurrent misses for one
+    exercise wait on a single load instead of each unpickling the forest.
+    Exercises the registry does not know are rejected before any of that.
+    Artifacts whose registered checksum does not match are not served.
+    With ``shadow`` the cache holds the exercises' shadow candidates instead.
+    """
+
+    def __init__(self, check_seconds=MODEL_CACHE_CHECK_SECONDS, loader=load_bundle, shadow=False):
+        self.check_seconds = check_seconds
+        self.shadow = shadow
+        self._loader = loader
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, exercise):
+        """(bundle, path) for ``exercise``, or None if it has no model."""
+        entry = self._entries.get(exercise)
+        if entry is not None and time.monotonic() - entry.checked_at < self.check_seconds:
+            return entry.bundle, entry.path
+
+        # unknown names never get a lock, entry or registry scan of their own
+        if not get_model_registry().is_known(exercise):
+            self._entries.pop(exercise, None)
+            return None
+
+        with self._exercise_lock(exercise):
+            # another thread may have refreshed it while we waited
+            entry = self._entries.get(exercise)
+            if entry is not None and time.monotonic() - entry.checked_at < self.check_seconds:
+                return entry.bundle, entry.path
+
+            registered = get_model_registry().resolve(exercise, self.shadow)
+            if registered is None:
+                self._entries.pop(exercise, None)
+                return None
+
+            path = registered.path
+            stamp = registered.stamp + (os.path.getmtime(path),)
+            if entry is not None and entry.stamp == stamp:
+                entry.checked_at = time.monotonic()
+                return entry.bundle, entry.path
+
+            try:
+                bundle = self._loader(path, registered.checksum, registered.export_checksum)
+            except ChecksumMismatch:
+                print("MODEL CHECKSUM MISMATCH:", path)
+                self._entries.pop(exercise, None)
+                return None
+
+            entry = _CachedModel(path, stamp, bundle)
+            self._entries[exercise] = entry
+            return entry.bundle, entry.path
+
+    def version(self, exercise):
+        """Identity of the exercise's loaded model (artifact, AIModel row, mtime)."""
+        entry = self._entries.get(exercise)
+        return entry.stamp if entry is not None else None
+
+    def invalidate(self, exercise=None):
+        with self._lock:
+            if exercise is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(exercise, None)
+
+    def _exercise_lock(self, exercise):
+        with self._lock:
+            return self._locks.setdefault(exercise, threading.Lock())
+
+
+_model_cache = None
+_model_cache_lock = threading.Lock()
+
+
+def get_model_cache():
+    global _model_cache
+    if _model_cache is None:
+        with _model_cache_lock:
+            if _model_cache is None:
+                _model_cache = ModelCache()
+    return _model_cache
+
+
+_shadow_cache = None
+
+
+def get_shadow_model_cache():
+    global _shadow_cache
+    if _shadow_cache is None:
+        with _model_cache_lock:
+            if _shadow_cache is None:
+                _shadow_cache = ModelCache(shadow=True)
+    return _shadow_cache
+
+
+# ---------------- PREDICT ----------------
+def _predict(bundle, feature_rows):
+    """
+    (labels, probs) arrays for many feature dicts with one predict_proba
+    call; the label is the most probable class.
+    """
+    # flattened forest for single frames and small batches (no per-call
+    # sklearn overhead), sklearn's compiled tree walk for large ones
+    model = bundle.get("flat")
+    if model is None or len(feature_rows) > CLASSIFIER_FLAT_MAX_ROWS:
+        model = sklearn_model(bundle) or model
+    plan = feature_plan(tuple(bundle["features"]))  # correct feature order
+
+    # ---------------- ENGINEERED FEATURES ----------------
+    if len(feature_rows) == 1:
+        input_array = plan.row(feature_rows[0])
+    else:
+        input_array = plan.matrix(feature_rows)
+
+    if hasattr(model, "predict_proba"):
+        proba = model.predict_proba(input_array)
+        pred = model.classes_[proba.argmax(axis=1)]
+        prob = proba.max(axis=1)
+    else:
+        pred = model.predict(input_array)
+        prob = np.ones(len(pred))
+
+    labels = np.where(pred.astype(int) == 1, "correct", "incorrect")
+    return labels, prob
+
+
+# ---------------- CLASSIFY ----------------
+def classify_posture(exercise, features):
+    """Run the exercise's classifier on one feature dict; None if no model."""
+    cached = get_model_cache().get(exercise)
+
+    if cached is None:
+        return None
+
+    bundle, model_path = cached
+
+    # near-identical angles (holds, rest) reuse the previous prediction
+    memo = get_prediction_cache()
+    plan = feature_plan(tuple(bundle["features"]))
+    key = memo.key(exercise, get_model_cache().version(exercise), features, plan.inputs)
+    result = memo.get(key)
+
+    if result is None:
+        labels, probs = _predict(bundle, [features])
+        result = {
+            "label": str(labels[0]),
+            "prob": float(probs[0]),
+            "exercise": exercise,
+            "model_used": os.path.basename(model_path)
+        }
+        memo.put(key, result)
+
+    return dict(result)
+
+
+# ---------------- CLASSIFY MANY ----------------
+def classify_rows(exercise, feature_rows):
+    """
+    Score many feature dicts with one predict_proba call.
+    Returns a list of (label, prob) in input order, or None if no model.
+    """
+    cached = get_model_cache().get(exercise)
+
+    if cached is None:
+        return None
+
+    if not len(feature_rows):
+        return []
+
+    labels, probs = _predict(cached[0], feature_rows)
+    return [(str(label), float(prob)) for label, prob in zip(labels, probs)]
+
+
+def classify_batch(rows):
+    """
+    Score (exercise, features) pairs that may mix exercises.
+
+    Rows are grouped by exercise and each group is scored with a single
+    predict_proba call. Returns one classify_posture-style dict per row, in
+    input order; rows whose exercise has no model get None.
+    """
+    groups = {}
+    for i, (exercise, features) in enumerate(rows):
+        groups.setdefault(exercise, []).append(i)
+
+    results = [None] * len(rows)
+    for exercise, positions in groups.items():
+        cached = get_model_cache().get(exercise)
+        if cached is None:
+            continue
+
+        bundle, model_path = cached
+        labels, probs = _predict(bundle, [rows[i][1] for i in positions])
+        model_used = os.path.basename(model_path)
+
+        for i, label, prob in zip(positions, labels, probs):
+            results[i] = {
+                "label": str(label),
+                "prob": float(prob),
+                "exercise": exercise,
+                "model_used": model_used
+            }
+    return results
@@ -0,0 +1,153 @@
+import numpy as np
+
+# MediaPipe Pose landmark indices used by the posture features
+LANDMARK_INDEX = {
+    "left_shoulder": 11, "right_shoulder": 12,
+    "left_elbow": 13, "right_elbow": 14,
+    "left_wrist": 15, "right_wrist": 16,
+    "left_hip": 23, "right_hip": 24,
+    "left_knee": 25, "right_knee": 26,
+    "left_ankle": 27, "right_ankle": 28,
+}
+
+# feature name -> joints (a, b, c) of the angle measured at b
+JOINT_ANGLES = {
+    "kneeAngle": ("hip", "knee", "ankle"),
+    "hipAngle": ("shoulder", "hip", "knee"),
+    "elbowAngle": ("shoulder", "elbow", "wrist"),
+    "legRaiseAngle": ("shoulder", "hip", "ankle"),
+}
+
+FEATURE_NAMES = list(JOINT_ANGLES) + ["visibilityScore", "posture_stability"]
+
+VISIBLE_SCORE = 0.4
+
+
+def _index(side, joint):
+    return LANDMARK_INDEX[f"{side}_{joint}"]
+
+
+# ---------------- Angles ----------------
+def angles_between(a, b, c):
+    """
+    Angle ABC in degrees over the last axis of (..., 2) arrays, same as
+    calculateAngle in featureExtractor.js (NaN from zero-length limbs or
+    |cos| > 1 becomes 0).
+    """
+    ab = a - b
+    cb = c - b
+    dot = (ab * cb).sum(axis=-1)
+    norm = np.linalg.norm(ab, axis=-1) * np.linalg.norm(cb, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        angle = np.degrees(np.arccos(dot / norm))
+    return np.where(np.isnan(angle), 0.0, angle)
+
+
+def joint_angles(landmarks, frame_shape=None):
+    """
+    Every joint angle for both sides of a (frames, 33, C) landmark array.
+
+    Returns {feature name: (frames, 2) array of [left, right] angles}.
+    Coordinates are the first two channels; normalized values are scaled to
+    pixels with ``frame_shape`` (height, width) so the frame's aspect ratio
+    does not skew the angles.
+    """
+    points = _pixel_points(landmarks, frame_shape)
+    return {
+        name: np.stack([
+            angles_between(points[:, _index(side, a)], points[:, _index(side, b)], points[:, _index(side, c)])
+            for side in ("left", "right")
+        ], axis=-1)
+        for name, (a, b, c) in JOINT_ANGLES.items()
+    }
+
+
+def _pixel_points(landmarks, frame_shape):
+    points = np.asarray(landmarks, dtype=np.float64)[..., :2]
+    if frame_shape:
+        points = points * np.array([frame_shape[1], frame_shape[0]], dtype=np.float64)
+    return points
+
+
+# ---------------- Batch Features ----------------
+def batch_features(landmarks, frame_shape=None, side=None):
+    """
+    Vectorized extractFeatures() over a (frames, 33, C) landmark array.
+
+    The last channel is the visibility score, so both [x, y, visibility]
+    and MediaPipe's [x, y, z, visibility] layouts work. Per frame the side
+    facing the camera is the hip with the higher visibility (or ``side``
+    if given); the elbow angle averages both arms when both are visible.
+
+    Returns {feature name: (frames,) array}, plus ``<angle>_delta`` frame
+    to frame changes (0 for the first frame).
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    scores = landmarks[..., -1]
+    points = _pixel_points(landmarks, frame_shape)
+    angles = joint_angles(landmarks, frame_shape)
+
+    # ---------------- SIDE SELECTION ----------------
+    if side is None:
+        use_left = scores[:, LANDMARK_INDEX["left_hip"]] > scores[:, LANDMARK_INDEX["right_hip"]]
+    else:
+        use_left = np.full(len(landmarks), side == "left")
+    pick = np.where(use_left, 0, 1)
+    rows = np.arange(len(landmarks))
+
+    features = {
+        name: angles[name][rows, pick]
+        for name in ("kneeAngle", "hipAngle", "legRaiseAngle")
+    }
+
+    # ---------------- ELBOW (SMART ARM SELECTION) ----------------
+    left_score = scores[:, LANDMARK_INDEX["left_elbow"]]
+    right_score = scores[:, LANDMARK_INDEX["right_elbow"]]
+    left_elbow, right_elbow = angles["elbowAngle"][:, 0], angles["elbowAngle"][:, 1]
+
+    features["elbowAngle"] = np.where(
+        (left_score > VISIBLE_SCORE) & (right_score > VISIBLE_SCORE),
+        (left_elbow + right_elbow) / 2,
+        np.where(left_score > right_score, left_elbow, right_elbow),
+    )
+
+    # ---------------- VISIBILITY / STABILITY ----------------
+    features["visibilityScore"] = (scores > VISIBLE_SCORE).mean(axis=1)
+
+    movement = np.zeros(len(landmarks))
+    if len(landmarks) > 1:
+        step = np.diff(points, axis=0)
+        movement[1:] = np.hypot(step[..., 0], step[..., 1]).sum(axis=1)
+    features["posture_stability"] = np.maximum(0.0, 1 - movement / 2000)
+
+    # ---------------- DELTAS ----------------
+    for name in JOINT_ANGLES:
+        delta = np.zeros(len(landmarks))
+        delta[1:] = np.diff(features[name])
+        features[f"{name}_delta"] = delta
+
+    return features
+
+
+# ---------------- Single Frame ----------------
+def active_side(landmarks):
+    """Side facing the camera: the hip with the higher visibility."""
+    left, right = landmarks[LANDMARK_INDEX["left_hip"], -1], landmarks[LANDMARK_INDEX["right_hip"], -1]
+    return "left" if left > right else "right"
+
+
+def extract_features(landmarks, frame_shape=None, prev_landmarks=None, side=None):
+    """
+    Python port of extractFeatures() in theratrack-frontend/src/ai/featureExtractor.js
+    for one frame of MediaPipe (33, 4) [x, y, z, visibility] landmarks.
+    """
+    if prev_landmarks is not None and len(prev_landmarks) == len(landmarks):
+        frames = np.stack([prev_landmarks, landmarks])
+    else:
+        frames = np.asarray(landmarks)[None]
+
+    if side is None:
+        side = active_side(landmarks)
+
+    batch = batch_features(frames, frame_shape, side)
+    return {name: float(batch[name][-1]) for name in FEATURE_NAMES}
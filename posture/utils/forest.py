@@ -0,0 +1,235 @@
+import os
+import threading
+
+import joblib
+import numpy as np
+from django.conf import settings
+
+from posture.utils.model_registry import file_checksum
+
+# Evaluate random forests with FlatForest instead of sklearn
+CLASSIFIER_FLAT_FOREST = getattr(settings, "CLASSIFIER_FLAT_FOREST", True)
+# Memory-map exported arrays read-only so worker processes share them
+CLASSIFIER_MMAP = getattr(settings, "CLASSIFIER_MMAP", True)
+# Larger batches go through sklearn, whose compiled tree walk wins past ~1000 rows
+CLASSIFIER_FLAT_MAX_ROWS = getattr(settings, "CLASSIFIER_FLAT_MAX_ROWS", 1000)
+
+# exported arrays live next to the pickle: <artifact>.flat.joblib
+FLAT_SUFFIX = ".flat.joblib"
+
+
+def flat_path(artifact):
+    return os.path.splitext(artifact)[0] + FLAT_SUFFIX
+
+
+class ChecksumMismatch(ValueError):
+    pass
+
+
+# ---------------- Flat Forest ----------------
+class FlatForest:
+    """
+    A fitted RandomForestClassifier flattened into contiguous arrays.
+
+    All trees share one node table (split feature, threshold, left and
+    right child, class probabilities). Leaves point at themselves, so every
+    row walks every tree for exactly ``depth`` vectorized steps with no
+    per-tree Python loop.
+
+    Matches sklearn's predict_proba bit for bit: rows are compared as
+    float32 like sklearn's trees do, leaf values are the trees' stored class
+    fractions, copied as-is (pickles from sklearn < 1.4 stored counts, which
+    are normalized first), and the trees are summed in order before dividing
+    by their count.
+    """
+
+    ARRAYS = ("feature", "threshold", "left", "right", "values", "roots", "classes_")
+
+    def __init__(self, feature, threshold, left, right, values, roots, classes_, depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.values = values
+        self.roots = roots
+        self.classes_ = classes_
+        self.depth = int(depth)
+
+    @classmethod
+    def from_model(cls, model):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+
+            proba = tree.value[:, 0, :].astype(np.float64)
+            # sklearn >= 1.4 stores leaf fractions; older pickles hold counts
+            totals = proba.sum(axis=1)
+            if not np.allclose(totals[totals > 0], 1.0):
+                totals[totals == 0.0] = 1.0
+                proba = proba / totals[:, np.newaxis]
+
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+            values.append(proba)
+            roots.append(offset)
+
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+
+        return cls(
+            np.concatenate(features).astype(np.intp),
+            np.concatenate(thresholds).astype(np.float64),
+            np.concatenate(lefts).astype(np.intp),
+            np.concatenate(rights).astype(np.intp),
+            np.concatenate(values),
+            np.array(roots, dtype=np.intp),
+            np.asarray(model.classes_),
+            depth,
+        )
+
+    # ---------------- Evaluate ----------------
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis]
+
+        rows = np.arange(len(X))[:, np.newaxis]
+        node = np.repeat(self.roots[np.newaxis], len(X), axis=0)
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        # cumsum adds the trees strictly in order, like sklearn's accumulation
+        total = np.cumsum(self.values[node], axis=1)[:, -1]
+        return total / len(self.roots)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    # ---------------- Export ----------------
+    def to_arrays(self):
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        arrays["depth"] = self.depth
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(*(arrays[name] for name in cls.ARRAYS), arrays["depth"])
+
+
+def is_forest(model):
+    return hasattr(model, "estimators_") and all(hasattr(e, "tree_") for e in model.estimators_)
+
+
+def export_forest(model, artifact, features=None):
+    """
+    Write the flattened forest next to ``artifact``; returns its path.
+
+    With the bundle's ``features`` list included the export is enough to
+    serve predictions on its own. joblib stores the arrays uncompressed, so
+    they can be memory-mapped.
+    """
+    path = flat_path(artifact)
+    arrays = FlatForest.from_model(model).to_arrays()
+    if features is not None:
+        arrays["features"] = list(features)
+    joblib.dump(arrays, path)
+    return path
+
+
+def _load_export(artifact, checksum=""):
+    """
+    Exported arrays of ``artifact`` if at least as new as it, else None.
+    With a ``checksum`` the export is only used when it matches.
+    """
+    path = flat_path(artifact)
+    try:
+        if os.path.getmtime(path) < os.path.getmtime(artifact):
+            return None
+        if checksum and file_checksum(path) != checksum:
+            print("FLAT FOREST CHECKSUM MISMATCH:", path)
+            return None
+        return joblib.load(path, mmap_mode="r" if CLASSIFIER_MMAP else None)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print("FLAT FOREST LOAD ERROR:", e)
+        return None
+
+
+def attach_flat_forest(bundle, arrays=None):
+    """
+    Copy of ``bundle`` with a ``flat`` evaluator for its forest, built from
+    already loaded export ``arrays`` when given, else from the model.
+    """
+    model = bundle.get("model")
+    if not CLASSIFIER_FLAT_FOREST or not is_forest(model):
+        return bundle
+
+    if arrays is not None:
+        return {**bundle, "flat": FlatForest.from_arrays(arrays)}
+    return {**bundle, "flat": FlatForest.from_model(model)}
+
+
+def load_bundle(artifact, checksum="", export_checksum=""):
+    """
+    Classifier bundle for ``artifact``.
+
+    When a self-contained export exists only it is loaded, with its arrays
+    memory-mapped read-only: every worker process then serves the forest
+    from the same page-cache pages instead of its own unpickled copy. The
+    bundle has no sklearn ``model`` in that case until ``sklearn_model``
+    loads it. Otherwise the pickle is loaded and the forest flattened
+    in-process.
+
+    Only the file actually loaded is checked. An export with a registered
+    ``export_checksum`` is served only if it matches; one without is only
+    trusted while the pickle has no ``checksum`` either. A pickle that is
+    loaded must match ``checksum`` or ChecksumMismatch is raised.
+    """
+    arrays = None
+    if CLASSIFIER_FLAT_FOREST and (export_checksum or not checksum):
+        arrays = _load_export(artifact, export_checksum)
+        if arrays is not None and "features" in arrays:
+            return {
+                "features": arrays["features"],
+                "flat": FlatForest.from_arrays(arrays),
+                # the pickle is only unpickled if a large batch needs sklearn
+                "artifact": artifact,
+                "checksum": checksum,
+            }
+
+    if checksum and file_checksum(artifact) != checksum:
+        raise ChecksumMismatch(artifact)
+    # an export without the feature list still saves flattening the forest
+    return attach_flat_forest(joblib.load(artifact), arrays)
+
+
+_model_lock = threading.Lock()
+
+
+def sklearn_model(bundle):
+    """
+    The bundle's sklearn model, unpickled on first use for bundles served
+    from an export; None if there is none or its pickle fails the checksum.
+    """
+    model = bundle.get("model")
+    if model is not None or "artifact" not in bundle:
+        return model
+
+    with _model_lock:
+        if bundle.get("model") is None:
+            artifact, checksum = bundle["artifact"], bundle["checksum"]
+            if checksum and file_checksum(artifact) != checksum:
+                print("MODEL CHECKSUM MISMATCH:", artifact)
+                bundle.pop("artifact")
+                return None
+            bundle["model"] = joblib.load(artifact)["model"]
+    return bundle["model"]
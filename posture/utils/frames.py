@@ -0,0 +1,105 @@
+import base64
+
+import cv2
+import numpy as np
+
+# Content types accepted as a raw encoded image in the request body
+RAW_FRAME_CONTENT_TYPES = (
+    "application/octet-stream",
+    "image/jpeg",
+    "image/webp",
+    "image/png",
+)
+
+
+class FrameDecodeError(ValueError):
+    pass
+
+
+# ---------------- Read Frame ----------------
+def read_frame(request):
+    """
+    Return (buffer, options) for a pose request.
+
+    Three ingestion modes are supported:
+      * raw JPEG/WebP bytes as the body (octet-stream or image/*),
+        options come from the query string
+      * multipart upload with a ``frame`` file field
+      * the original JSON body with a base64 data-URL in ``frame``
+
+    The raw and multipart modes hand back a view over the request buffer,
+    so nothing is copied before ``cv2.imdecode``.
+    """
+    content_type = (request.content_type or "").split(";")[0].strip().lower()
+    options = dict(request.query_params.items())
+
+    if content_type in RAW_FRAME_CONTENT_TYPES:
+        # request.data is never touched so DRF does not try to parse the body
+        return memoryview(request.body), options
+
+    data = request.data
+    options.update({k: v for k, v in data.items() if k != "frame"})
+
+    if content_type == "multipart/form-data":
+        upload = request.FILES.get("frame")
+        if upload is None:
+            raise FrameDecodeError("Missing 'frame' file")
+        if hasattr(upload.file, "getbuffer"):
+            return upload.file.getbuffer(), options
+        return upload.read(), options
+
+    return decode_data_url(data.get("frame")), options
+
+
+def read_frames(request):
+    """
+    Return (buffers, options) for a batch pose request.
+
+    Accepts either a multipart upload with repeated ``frames`` file fields
+    or a JSON body with a ``frames`` list of base64 data-URLs.
+    """
+    content_type = (request.content_type or "").split(";")[0].strip().lower()
+    options = dict(request.query_params.items())
+    data = request.data
+    options.update({k: v for k, v in data.items() if k != "frames"})
+
+    if content_type == "multipart/form-data":
+        return [upload.read() for upload in request.FILES.getlist("frames")], options
+
+    frames = data.get("frames") or []
+    if not isinstance(frames, list):
+        raise FrameDecodeError("'frames' must be a list")
+    return [decode_data_url(frame) for frame in frames], options
+
+
+def request_timestamp(options):
+    """Client ``timestamp`` (ms) in seconds, or None."""
+    try:
+        return float(options["timestamp"]) / 1000
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def decode_data_url(frame):
+    if not frame:
+        raise FrameDecodeError("Missing 'frame'")
+    if not isinstance(frame, str):
+        raise FrameDecodeError("'frame' must be a base64 string")
+    if "," in frame:
+        frame = frame.split(",", 1)[1]
+    try:
+        return base64.b64decode(frame)
+    except ValueError:
+        raise FrameDecodeError("Invalid base64 frame")
+
+
+# ---------------- Decode Frame ----------------
+def decode_frame(buffer, flags=cv2.IMREAD_COLOR):
+    np_arr = np.frombuffer(buffer, np.uint8)
+    if np_arr.size == 0:
+        raise FrameDecodeError("Empty frame")
+
+    img = cv2.imdecode(np_arr, flags)
+    if img is None:
+        raise FrameDecodeError("Could not decode frame")
+    return img
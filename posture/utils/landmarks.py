@@ -0,0 +1,99 @@
+import json
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:  # optional, only needed for the msgpack wire format
+    msgpack = None
+
+LANDMARK_FIELDS = ("x", "y", "z", "visibility")
+
+# MediaPipe Pose landmark indices each exercise actually needs
+EXERCISE_JOINTS = {
+    "squats": [23, 24, 25, 26, 27, 28],                             # hips, knees, ankles
+    "bicep curls": [11, 12, 13, 14, 15, 16],                        # shoulders, elbows, wrists
+    "side leg raises": [11, 12, 23, 24, 25, 26, 27, 28],            # shoulders, hips, knees, ankles
+}
+
+# Compact encodings negotiated through the Accept header
+PACKED_MEDIA_TYPES = {
+    "application/x-landmarks-f16": np.float16,
+    "application/x-landmarks-f32": np.float32,
+}
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+# ---------------- Landmark Serialization ----------------
+def array_to_list(landmarks):
+    if landmarks is None:
+        return []
+    return [{"x": float(x), "y": float(y)} for x, y in landmarks[:, :2]]
+
+
+def landmarks_to_array(results):
+    """(33, 4) float32 array of x, y, z, visibility, or None if no pose."""
+    if not results.pose_landmarks:
+        return None
+    return np.array(
+        [(l.x, l.y, l.z, l.visibility) for l in results.pose_landmarks.landmark],
+        dtype=np.float32,
+    )
+
+
+# ---------------- Compact Wire Format ----------------
+def negotiate_format(accept):
+    """First compact media type listed in the Accept header, else None (JSON)."""
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in PACKED_MEDIA_TYPES:
+            return media_type
+        if media_type == MSGPACK_MEDIA_TYPE and msgpack is not None:
+            return media_type
+    return None
+
+
+def joint_indices(exercise):
+    return EXERCISE_JOINTS.get((exercise or "").lower().strip())
+
+
+def encode_landmarks(landmarks, media_type, indices=None, meta=None, smoothed=None):
+    """
+    Encode landmarks for a compact media type. Returns (body, headers).
+
+    Packed formats are a row-major [joints][x, y, z, visibility] array in
+    little-endian float16/float32; with ``smoothed`` the filtered set follows
+    the raw one in the same body (see X-Landmark-Sets). Any extra response
+    fields travel as JSON in the X-Pose-Meta header. msgpack carries
+    everything in one map.
+    """
+    meta = dict(meta or {})
+    if indices is not None:
+        landmarks = None if landmarks is None else landmarks[indices]
+        smoothed = None if smoothed is None else smoothed[indices]
+
+    if media_type == MSGPACK_MEDIA_TYPE:
+        payload = {
+            "fields": list(LANDMARK_FIELDS),
+            "indices": indices,
+            "landmarks": None if landmarks is None else landmarks.astype("<f4").tobytes(),
+            **meta,
+        }
+        if smoothed is not None:
+            payload["smoothed_landmarks"] = smoothed.astype("<f4").tobytes()
+        return msgpack.packb(payload), {}
+
+    dtype = np.dtype(PACKED_MEDIA_TYPES[media_type]).newbyteorder("<")
+    sets = [s for s in (landmarks, smoothed) if s is not None]
+    body = b"".join(np.ascontiguousarray(s, dtype=dtype).tobytes() for s in sets)
+    headers = {
+        "X-Landmark-Fields": ",".join(LANDMARK_FIELDS),
+        "X-Landmark-Count": str(0 if landmarks is None else len(landmarks)),
+    }
+    if smoothed is not None:
+        headers["X-Landmark-Sets"] = "raw,smoothed"
+    if indices is not None:
+        headers["X-Landmark-Indices"] = ",".join(str(i) for i in indices)
+    if meta:
+        headers["X-Pose-Meta"] = json.dumps(meta, separators=(",", ":"))
+    return body, headers
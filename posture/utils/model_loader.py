@@ -1,19 +1,22 @@
 import joblib
-import os
+
 from posture.models import AIModel
+from posture.utils.classifier import get_model_cache
+from posture.utils.model_registry import find_scaler, get_model_registry
 
-MODEL_DIR = "ml_models/"
 
-def load_active_model():
-    model_db = AIModel.objects.filter(is_active=True).first()
+def load_active_model(exercise):
+    registered = get_model_registry().resolve(exercise)
+    cached = get_model_cache().get(exercise)
 
-    if not model_db:
-        raise Exception("No active model found")
+    if registered is None or cached is None:
+        raise Exception(f"No active model found for {exercise}")
 
-    model_path = os.path.join(MODEL_DIR, f"posture_v{model_db.version}.pkl")
-    scaler_path = os.path.join(MODEL_DIR, f"scaler_v{model_db.version}.pkl")
+    bundle, _ = cached
+    model_db = AIModel.objects.filter(pk=registered.model_id).first() if registered.model_id else None
 
-    model = joblib.load(model_path)
-    scaler = joblib.load(scaler_path)
+    scaler_path = find_scaler(exercise)
+    scaler = joblib.load(scaler_path) if scaler_path else None
 
-    return model, scaler, model_db
\ No newline at end of file
+    # memory-mapped bundles carry only the flattened forest
+    return bundle.get("model") or bundle["flat"], scaler, model_db
@@ -0,0 +1,211 @@
+import hashlib
+import os
+import threading
+import time
+
+from django.conf import settings
+
+# Seconds the active-model map is trusted before it is reloaded from AIModel
+MODEL_CACHE_CHECK_SECONDS = getattr(settings, "MODEL_CACHE_CHECK_SECONDS", 5)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODEL_DIR = os.path.join(BASE_DIR, "ml_models")
+
+
+# ---------------- Artifacts ----------------
+def artifact_name(exercise, version):
+    """File name train_model.py gives an exercise's classifier."""
+    return f"{exercise}_model_{version}.pkl"
+
+
+def artifact_path(path):
+    """Absolute path of an artifact stored relative to the project root."""
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def registered_artifact(exercise, version, path):
+    """Absolute artifact path of an AIModel row; rows without artifact_path use the naming."""
+    return artifact_path(path) if path else os.path.join(MODEL_DIR, artifact_name(exercise, version))
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ---------------- Legacy Directory Scan ----------------
+def find_latest_model(exercise_name):
+    try:
+        exercise_name = exercise_name.lower().replace(" ", "")
+
+        models = []
+
+        for file in os.listdir(MODEL_DIR):
+            f = file.lower().replace(" ", "")
+
+            if exercise_name in f and f.endswith(".pkl") and "model" in f:
+                models.append(file)
+
+        if not models:
+            return None
+
+        # pick latest version (timestamp at end)
+        models.sort(reverse=True)
+        return os.path.join(MODEL_DIR, models[0])
+
+    except Exception as e:
+        print("FILE SEARCH ERROR:", e)
+        return None
+
+
+def find_scaler(exercise_name):
+    try:
+        exercise_name = exercise_name.lower().replace(" ", "")
+
+        for file in os.listdir(MODEL_DIR):
+            f = file.lower().replace(" ", "")
+
+            if exercise_name in f and "scaler" in f:
+                return os.path.join(MODEL_DIR, file)
+
+        return None
+
+    except Exception as e:
+        print("SCALER SEARCH ERROR:", e)
+        return None
+
+
+# ---------------- Registry ----------------
+class RegisteredModel:
+    __slots__ = ("exercise", "path", "model_id", "version", "checksum", "export_checksum", "last_updated")
+
+    def __init__(self, exercise, path, model_id=None, version=None, checksum="", last_updated=None,
+                 export_checksum=""):
+        self.exercise = exercise
+        self.path = path
+        self.model_id = model_id
+        self.version = version
+        self.checksum = checksum
+        self.export_checksum = export_checksum
+        self.last_updated = last_updated
+
+    @property
+    def stamp(self):
+        """Changes whenever a different artifact or AIModel row becomes active."""
+        return (self.path, self.model_id, self.version, self.last_updated)
+
+
+class ModelRegistry:
+    """
+    Exercise -> active classifier artifact, resolved from AIModel.
+
+    One query loads every active row into an in-memory map, so resolving a
+    model is a dict lookup until ``refresh_seconds`` pass. Rows registered
+    before artifact_path existed resolve by train_model.py's file naming;
+    only exercises with no active row at all fall back to scanning
+    ml_models/, once per refresh, and only if they are known exercises
+    (an Exercise row or a rep-counted exercise): arbitrary client strings
+    resolve to None without being cached or scanned for. Shadow candidates
+    (``is_shadow`` rows) are resolved the same way, without the fallback.
+    """
+
+    def __init__(self, refresh_seconds=MODEL_CACHE_CHECK_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._resolved = {}
+        self._shadows = {}
+        self._known = frozenset()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def resolve(self, exercise, shadow=False):
+        """The exercise's active (or shadow candidate) RegisteredModel, or None."""
+        self._refresh_if_stale()
+
+        if shadow:
+            return self._shadows.get(exercise)
+
+        try:
+            return self._resolved[exercise]
+        except KeyError:
+            pass
+
+        if exercise not in self._known:
+            return None
+
+        path = find_latest_model(exercise) if exercise else None
+        entry = RegisteredModel(exercise, path, version=os.path.basename(path)) if path else None
+        with self._lock:
+            self._resolved[exercise] = entry
+        return entry
+
+    def is_known(self, exercise):
+        """Whether ``exercise`` may have a model; callers reject the rest up front."""
+        self._refresh_if_stale()
+        return exercise in self._known or exercise in self._shadows
+
+    def active_exercises(self):
+        """Exercises that currently resolve to a model."""
+        self.refresh()
+        with self._lock:
+            return [exercise for exercise, entry in self._resolved.items() if entry is not None]
+
+    def _refresh_if_stale(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            self.refresh()
+
+    def refresh(self):
+        from django.db.models import Q
+
+        from posture.models import AIModel, Exercise
+        from posture.utils.reps import REP_THRESHOLDS
+
+        with self._lock:
+            # another thread refreshed while we waited
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+
+            resolved, shadows = {}, {}
+            known = set(REP_THRESHOLDS)
+            try:
+                rows = AIModel.objects.filter(
+                    Q(is_active=True) | Q(is_shadow=True)
+                ).exclude(exercise=None).values_list(
+                    "exercise", "model_id", "version", "artifact_path", "checksum", "export_checksum",
+                    "last_updated", "is_active"
+                )
+                for exercise, model_id, version, path, checksum, export_checksum, last_updated, is_active in rows:
+                    path = registered_artifact(exercise, version, path)
+                    if os.path.exists(path):
+                        target = resolved if is_active else shadows
+                        target[exercise] = RegisteredModel(exercise, path, model_id, version, checksum,
+                                                           last_updated, export_checksum)
+                known.update(resolved)
+                known.update(name.lower().strip() for name in Exercise.objects.values_list("exercise_name", flat=True))
+            except Exception as e:
+                print("MODEL REGISTRY ERROR:", e)
+
+            self._resolved = resolved
+            self._shadows = shadows
+            self._known = frozenset(known)
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+
+# ---------------- Global ----------------
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+
+INFERENCE_ASYNC_VIEWS = getattr(settings, "INFERENCE_ASYNC_VIEWS", False)
+# executor name -> worker threads
+INFERENCE_EXECUTOR_WORKERS = getattr(settings, "INFERENCE_EXECUTOR_WORKERS", {})
+# Requests allowed to wait per executor before new ones get a 503
+INFERENCE_QUEUE_LIMIT = getattr(settings, "INFERENCE_QUEUE_LIMIT", 16)
+
+
+# ---------------- Executors ----------------
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_inference_executor(name):
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=INFERENCE_EXECUTOR_WORKERS.get(name, 1),
+                    thread_name_prefix=f"{name}-inference",
+                )
+                _executors[name] = executor
+    return executor
+
+
+# ---------------- Async Views ----------------
+# executor name -> requests running or waiting on it; only touched from the
+# event loop, so no lock
+_pending = {}
+
+
+def offloaded(name):
+    """
+    Turn a sync view into an async one that runs on the ``name`` executor.
+
+    Under ASGI Django runs every sync view on one shared thread, so a slow
+    Pose call or chatbot generate would hold up every other request. The
+    async variant awaits the view on its own bounded thread pool instead,
+    leaving the event loop free for cheap endpoints.
+    """
+    def decorator(view):
+        def run(request, *args, **kwargs):
+            # worker threads keep their own DB connection between requests
+            close_old_connections()
+            try:
+                response = view(request, *args, **kwargs)
+                # DRF responses render lazily; do it off the event loop
+                if hasattr(response, "render") and not getattr(response, "is_rendered", True):
+                    response.render()
+                return response
+            finally:
+                close_old_connections()
+
+        call = sync_to_async(run, thread_sensitive=False, executor=get_inference_executor(name))
+
+        @wraps(view)
+        async def async_view(request, *args, **kwargs):
+            # views sharing an executor share its queue limit
+            if _pending.get(name, 0) >= INFERENCE_QUEUE_LIMIT:
+                return JsonResponse({"error": "Server busy, retry shortly"}, status=503)
+            _pending[name] = _pending.get(name, 0) + 1
+            try:
+                return await call(request, *args, **kwargs)
+            finally:
+                _pending[name] -= 1
+
+        return async_view
+    return decorator
+
+
+def inference_view(view, name):
+    """The async variant of ``view`` when served through asgi.py, else ``view``."""
+    return offloaded(name)(view) if INFERENCE_ASYNC_VIEWS else view
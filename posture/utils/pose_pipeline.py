@@ -0,0 +1,196 @@
+import cv2
+import numpy as np
+from django.conf import settings
+
+from posture.utils.classifier import classify_posture
+from posture.utils.features import extract_features
+from posture.utils.frames import decode_frame
+from posture.utils.landmarks import landmarks_to_array
+
+# Longest side (px) of the image handed to MediaPipe; 0 disables downscaling
+POSE_MAX_INFERENCE_SIZE = getattr(settings, "POSE_MAX_INFERENCE_SIZE", 640)
+POSE_ROI_CROP = getattr(settings, "POSE_ROI_CROP", True)
+# Padding around the previous landmarks' bounding box, as a fraction of its size
+POSE_ROI_PADDING = getattr(settings, "POSE_ROI_PADDING", 0.3)
+
+# Mean absolute grayscale difference (0-255) under which a frame counts as a repeat
+POSE_DEDUP_THRESHOLD = getattr(settings, "POSE_DEDUP_THRESHOLD", 2.0)
+# Consecutive repeats answered from cache before inference is forced again
+POSE_DEDUP_MAX_REUSE = getattr(settings, "POSE_DEDUP_MAX_REUSE", 5)
+
+ROI_MIN_VISIBILITY = 0.5
+FINGERPRINT_SIZE = (16, 16)
+
+# cv2 flags that let libjpeg/libwebp decode straight to 1/2, 1/4, 1/8 scale
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+# ---------------- Decode ----------------
+def _decode_flags(state, max_size):
+    """Pick the smallest reduced decode that still covers max_size."""
+    if not max_size or state is None or state.frame_shape is None:
+        return cv2.IMREAD_COLOR, 1
+
+    longest = max(state.frame_shape)
+    for factor, flag in _REDUCED_DECODE_FLAGS:
+        if longest / factor >= max_size:
+            return flag, factor
+    return cv2.IMREAD_COLOR, 1
+
+
+# ---------------- Frame Fingerprint ----------------
+def _fingerprint(img):
+    thumb = cv2.resize(img, FINGERPRINT_SIZE, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY).astype(np.int16)
+
+
+def _is_repeat(state, fingerprint, threshold, max_reuse):
+    if not threshold or state.landmarks is None or state.fingerprint is None:
+        return False
+    if state.reused >= max_reuse:
+        return False
+    return np.abs(fingerprint - state.fingerprint).mean() < threshold
+
+
+# ---------------- ROI ----------------
+def _landmark_box(landmarks):
+    visible = landmarks[landmarks[:, 3] >= ROI_MIN_VISIBILITY]
+    if len(visible) < 4:
+        return None
+    x0, y0 = visible[:, 0].min(), visible[:, 1].min()
+    x1, y1 = visible[:, 0].max(), visible[:, 1].max()
+    return x0, y0, x1, y1
+
+
+def _next_roi(state, padding):
+    """
+    Padded box around the previous landmarks. The box is only moved when
+    the body drifts out of its inner margin, so MediaPipe keeps tracking in
+    a stable coordinate frame instead of seeing a new crop every frame.
+    """
+    if state is None or state.landmarks is None:
+        return None
+
+    box = _landmark_box(state.landmarks)
+    if box is None:
+        return None
+    x0, y0, x1, y1 = box
+
+    if state.roi is not None:
+        rx0, ry0, rx1, ry1 = state.roi
+        mx, my = (rx1 - rx0) * padding / 4, (ry1 - ry0) * padding / 4
+        if x0 >= rx0 + mx and y0 >= ry0 + my and x1 <= rx1 - mx and y1 <= ry1 - my:
+            return state.roi
+
+    px, py = (x1 - x0) * padding, (y1 - y0) * padding
+    roi = (
+        max(0.0, x0 - px), max(0.0, y0 - py),
+        min(1.0, x1 + px), min(1.0, y1 + py),
+    )
+    if roi[2] - roi[0] >= 0.9 and roi[3] - roi[1] >= 0.9:
+        return None
+    return roi
+
+
+def _crop(img, roi):
+    h, w = img.shape[:2]
+    x0, y0 = int(roi[0] * w), int(roi[1] * h)
+    x1, y1 = max(x0 + 1, int(np.ceil(roi[2] * w))), max(y0 + 1, int(np.ceil(roi[3] * h)))
+    # report the box actually cropped so remapping is exact
+    return img[y0:y1, x0:x1], (x0 / w, y0 / h, x1 / w, y1 / h)
+
+
+def _resize(img, max_size):
+    h, w = img.shape[:2]
+    longest = max(h, w)
+    if not max_size or longest <= max_size:
+        return img
+    scale = max_size / longest
+    return cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+# ---------------- Pipeline ----------------
+def prepare_frame(buffer, state=None, max_size=POSE_MAX_INFERENCE_SIZE,
+                  roi_crop=POSE_ROI_CROP, padding=POSE_ROI_PADDING,
+                  dedup_threshold=POSE_DEDUP_THRESHOLD, max_reuse=POSE_DEDUP_MAX_REUSE):
+    """
+    Decode a frame and build the RGB image MediaPipe should see.
+
+    Returns (rgb, roi, frame_shape). ``roi`` is the normalized crop box
+    used, or None when the whole frame is analysed; ``frame_shape`` is the
+    (height, width) of the full frame, which the angle features need to
+    undo MediaPipe's normalization. Normalized landmarks do not change
+    under scaling, so only the crop needs undoing in ``finish_frame``.
+
+    ``rgb`` is None when the frame is a near-duplicate of the session's
+    last analysed frame; the caller should then reuse ``state.landmarks``.
+    """
+    flag, factor = _decode_flags(state, max_size)
+    img = decode_frame(buffer, flag)
+    frame_shape = (img.shape[0] * factor, img.shape[1] * factor)
+
+    if state is not None:
+        state.frame_shape = frame_shape
+
+        fingerprint = _fingerprint(img)
+        if _is_repeat(state, fingerprint, dedup_threshold, max_reuse):
+            state.reused += 1
+            return None, state.roi, frame_shape
+        # compare against the last analysed frame, not the last repeat
+        state.fingerprint = fingerprint
+        state.reused = 0
+
+    roi = _next_roi(state, padding) if roi_crop else None
+    if roi is not None:
+        img, roi = _crop(img, roi)
+
+    img = _resize(img, max_size)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB), roi, frame_shape
+
+
+def finish_frame(results, roi, state=None):
+    """Full-frame normalized (33, 4) landmarks, or None if no pose."""
+    landmarks = landmarks_to_array(results)
+
+    if landmarks is not None and roi is not None:
+        x0, y0, x1, y1 = roi
+        landmarks[:, 0] = x0 + landmarks[:, 0] * (x1 - x0)
+        landmarks[:, 1] = y0 + landmarks[:, 1] * (y1 - y0)
+        landmarks[:, 2] *= (x1 - x0)
+
+    if state is not None:
+        state.roi = roi if landmarks is not None else None
+        state.landmarks = landmarks
+    return landmarks
+
+
+# ---------------- Verdict ----------------
+def score_frame(exercise, landmarks, frame_shape=None, prev_landmarks=None, counter=None, timestamp=None):
+    """
+    Angle features and classifier verdict for one frame's landmarks, fed to
+    the session's rep ``counter`` when there is one. Returns
+    (features, verdict, rep) where ``rep`` is the rep this frame completed.
+    """
+    features = extract_features(landmarks, frame_shape, prev_landmarks)
+
+    try:
+        verdict = classify_posture(exercise, features)
+    except Exception as e:
+        print("PREDICT ERROR:", e)
+        verdict = None
+
+    if verdict is None:
+        verdict = {"label": "unknown", "prob": 0, "exercise": exercise, "model_used": None}
+
+    rep = None
+    if counter is not None:
+        p_correct = verdict["prob"] if verdict["label"] == "correct" else 1 - verdict["prob"]
+        if verdict["label"] == "unknown":
+            p_correct = None
+        rep = counter.update(features[counter.feature], p_correct, timestamp)
+        verdict["rep_count"] = counter.count
+    return features, verdict, rep
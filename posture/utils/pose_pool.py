@@ -0,0 +1,314 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from posture.utils.backpressure import LoadMonitor
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+import mediapipe as mp
+
+mp_pose = mp.solutions.pose
+
+POSE_POOL_SIZE = getattr(settings, "POSE_POOL_SIZE", 2)
+POSE_CHECKOUT_TIMEOUT = getattr(settings, "POSE_CHECKOUT_TIMEOUT", 5.0)
+POSE_MODEL_COMPLEXITY = getattr(settings, "POSE_MODEL_COMPLEXITY", 1)
+POSE_COMPLEXITY_TIERING = getattr(settings, "POSE_COMPLEXITY_TIERING", False)
+POSE_LATENCY_BUDGET_MS = getattr(settings, "POSE_LATENCY_BUDGET_MS", 50)
+POSE_COMPLEXITY_FLOORS = getattr(settings, "POSE_COMPLEXITY_FLOORS", {})
+
+# MediaPipe model_complexity: 0 lite, 1 full, 2 heavy
+COMPLEXITY_TIERS = (0, 1, 2)
+# Assumed inference time of a tier that has not been measured recently
+NOMINAL_LATENCY_MS = {0: 20, 1: 35, 2: 80}
+TIER_PROBE_SECONDS = 30
+# Moving a session up a tier needs this much of the budget to spare
+UPGRADE_HEADROOM = 0.8
+
+
+class PosePoolTimeout(Exception):
+    pass
+
+
+# ---------------- Pose Slot ----------------
+class _PoseSlot:
+    __slots__ = ("pose", "complexity", "session_key", "owner", "in_use", "last_used")
+
+    def __init__(self, pose, complexity, owner=None):
+        self.pose = pose
+        self.complexity = complexity
+        self.session_key = None
+        # session whose frames the tracking state belongs to (outlives the pin)
+        self.owner = owner
+        self.in_use = False
+        self.last_used = time.monotonic()
+
+
+def create_pose(model_complexity=POSE_MODEL_COMPLEXITY):
+    return mp_pose.Pose(
+        static_image_mode=False,
+        model_complexity=model_complexity,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+    )
+
+
+# ---------------- Pose Pool ----------------
+class PosePool:
+    """
+    Long-lived MediaPipe Pose instances shared by the requests of one worker.
+
+    A request with a session key is pinned to the same instance for the
+    whole workout, so MediaPipe keeps its tracking state between frames
+    instead of running full detection every time. When every instance is
+    pinned, the least recently used idle one is handed over to the new
+    session. An instance is reset whenever it serves a different session
+    than last time, and before every session-less request, so tracking
+    state never carries one user's pose into another's frames.
+    """
+
+    def __init__(self, size=POSE_POOL_SIZE, factory=create_pose, complexity=POSE_MODEL_COMPLEXITY):
+        self.size = max(1, int(size))
+        self.complexity = complexity
+        self._factory = factory
+        self._slots = []
+        self._sessions = {}
+        self._creating = 0
+        self._cond = threading.Condition()
+        # includes requests still waiting for an instance
+        self.load = LoadMonitor(self.size)
+
+    # ---------------- Checkout / Checkin ----------------
+    def checkout(self, session_key=None, timeout=POSE_CHECKOUT_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                slot = self._claim(session_key)
+                if slot is not None:
+                    slot.in_use = True
+                    reset = session_key is None or slot.owner != session_key
+                    slot.owner = session_key
+                    break
+
+                # a pinned session waits for its own slot rather than taking a second one
+                pinned = session_key is not None and session_key in self._sessions
+                if not pinned and len(self._slots) + self._creating < self.size:
+                    self._creating += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PosePoolTimeout("No pose instance available")
+                self._cond.wait(remaining)
+
+        # the slot is ours now: reset or build the graph outside the lock
+        if slot is not None:
+            if reset:
+                try:
+                    slot.pose.reset()
+                except Exception:
+                    self.checkin(slot)
+                    raise
+            return slot
+
+        try:
+            slot = _PoseSlot(self._factory(self.complexity), self.complexity, session_key)
+        except Exception:
+            with self._cond:
+                self._creating -= 1
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._creating -= 1
+            slot.in_use = True
+            self._slots.append(slot)
+            # the session may have been pinned elsewhere while we built the graph
+            if session_key not in self._sessions:
+                self._pin(slot, session_key)
+        return slot
+
+    def checkin(self, slot):
+        with self._cond:
+            slot.in_use = False
+            slot.last_used = time.monotonic()
+            self._cond.notify_all()
+
+    @contextmanager
+    def pose(self, session_key=None):
+        slot = self.checkout(session_key)
+        try:
+            yield slot.pose
+        finally:
+            self.checkin(slot)
+
+    def process(self, image_rgb, session_key=None):
+        with self.load.track(), self.pose(session_key) as pose, self.load.timed():
+            return pose.process(image_rgb)
+
+    # ---------------- Sessions ----------------
+    def has_session(self, session_key):
+        with self._cond:
+            return session_key in self._sessions
+
+    def release_session(self, session_key):
+        with self._cond:
+            slot = self._sessions.pop(session_key, None)
+            if slot is not None:
+                slot.session_key = None
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            for slot in self._slots:
+                slot.pose.close()
+            self._slots = []
+            self._sessions = {}
+
+    # ---------------- Internals (lock held) ----------------
+    def _claim(self, session_key):
+        if session_key is not None and session_key in self._sessions:
+            slot = self._sessions[session_key]
+            # frames of one session are processed in order
+            return None if slot.in_use else slot
+
+        idle = [s for s in self._slots if not s.in_use]
+        if not idle:
+            return None
+
+        unpinned = [s for s in idle if s.session_key is None]
+        if unpinned:
+            slot = unpinned[0]
+        elif len(self._slots) + self._creating < self.size:
+            return None
+        else:
+            slot = min(idle, key=lambda s: s.last_used)
+
+        self._pin(slot, session_key)
+        return slot
+
+    def _pin(self, slot, session_key):
+        # only drop the old session's mapping if it still points at this slot
+        if slot.session_key is not None and self._sessions.get(slot.session_key) is slot:
+            del self._sessions[slot.session_key]
+        slot.session_key = session_key
+        if session_key is not None:
+            self._sessions[session_key] = slot
+
+
+# ---------------- Complexity Tiers ----------------
+class TieredPosePool:
+    """
+    One PosePool per MediaPipe model_complexity, choosing the tier for each
+    request: the heaviest one whose expected latency (its recent inference
+    time, scaled by the current queue depth) fits the latency budget, never
+    below the exercise's floor. Under load requests fall back to the lite
+    model instead of queueing behind the full one.
+
+    A session stays on its tier while it still fits and only moves up once
+    the next tier fits with headroom, so MediaPipe's tracking state is not
+    thrown away on every fluctuation. Tiers build their instances lazily.
+    """
+
+    def __init__(self, tiers=COMPLEXITY_TIERS, size=POSE_POOL_SIZE, factory=create_pose,
+                 budget_ms=POSE_LATENCY_BUDGET_MS, floors=POSE_COMPLEXITY_FLOORS):
+        self.size = max(1, int(size))
+        self.tiers = {c: PosePool(self.size, factory, c) for c in sorted(tiers)}
+        self.budget_ms = budget_ms
+        self.floors = floors
+        # includes requests still waiting for an instance
+        self.load = LoadMonitor(self.size)
+
+    # ---------------- Tier Selection ----------------
+    def expected_ms(self, complexity):
+        monitor = self.tiers[complexity].load
+        latency = monitor.latency_ms
+        # re-probe tiers whose measurement is missing or stale
+        if not latency or time.monotonic() - monitor.updated > TIER_PROBE_SECONDS:
+            latency = NOMINAL_LATENCY_MS.get(complexity, latency)
+        return latency * max(1.0, (self.load.in_flight + 1) / self.size)
+
+    def session_tier(self, session_key):
+        if session_key is None:
+            return None
+        for complexity, pool in self.tiers.items():
+            if pool.has_session(session_key):
+                return complexity
+        return None
+
+    def select(self, exercise=None, session_key=None):
+        floor = self.floors.get(exercise, 0)
+        candidates = [c for c in self.tiers if c >= floor] or [max(self.tiers)]
+        current = self.session_tier(session_key)
+
+        chosen = candidates[0]
+        for complexity in candidates:
+            budget = self.budget_ms
+            if current is not None and complexity > current:
+                budget *= UPGRADE_HEADROOM
+            if self.expected_ms(complexity) <= budget:
+                chosen = complexity
+        return chosen
+
+    # ---------------- Checkout / Checkin ----------------
+    def checkout(self, session_key=None, timeout=POSE_CHECKOUT_TIMEOUT, exercise=None):
+        complexity = self.select(exercise, session_key)
+        current = self.session_tier(session_key)
+        if current is not None and current != complexity:
+            self.tiers[current].release_session(session_key)
+        return self.tiers[complexity].checkout(session_key, timeout)
+
+    def checkin(self, slot):
+        self.tiers[slot.complexity].checkin(slot)
+
+    @contextmanager
+    def timed(self, slot):
+        """Measure one inference call on ``slot`` for its tier and the worker."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.load.record(elapsed)
+            self.tiers[slot.complexity].load.record(elapsed)
+
+    def process(self, image_rgb, session_key=None, exercise=None):
+        with self.load.track():
+            slot = self.checkout(session_key, exercise=exercise)
+            try:
+                with self.timed(slot):
+                    return slot.pose.process(image_rgb)
+            finally:
+                self.checkin(slot)
+
+    # ---------------- Sessions ----------------
+    def release_session(self, session_key):
+        for pool in self.tiers.values():
+            pool.release_session(session_key)
+
+    def close(self):
+        for pool in self.tiers.values():
+            pool.close()
+
+
+# ---------------- Global ----------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pose_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                tiers = COMPLEXITY_TIERS if POSE_COMPLEXITY_TIERING else (POSE_MODEL_COMPLEXITY,)
+                _pool = TieredPosePool(tiers)
+    return _pool
+
+
+def pose_session_key(user, session_id):
+    if not session_id:
+        return None
+    return f"{user.pk}:{session_id}"
@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from posture.utils.frames import FrameDecodeError, decode_frame
+from posture.utils.landmarks import landmarks_to_array
+
+# NOTE: this module is imported inside the worker processes, so it must not
+# touch Django settings or models. Workers are spawned, not forked: a forked
+# child would inherit the server's threads (pose pool, executors) and
+# MediaPipe/TFLite state mid-flight, and can deadlock on their locks.
+
+# ---------------- Worker Process ----------------
+_worker_pose = None
+
+
+def _init_worker():
+    global _worker_pose
+    # frames from different clients interleave in a worker, so no tracking
+    _worker_pose = mp.solutions.pose.Pose(
+        static_image_mode=True,
+        min_detection_confidence=0.5,
+    )
+
+
+def analyze_frame(buffer):
+    try:
+        img = decode_frame(buffer)
+    except FrameDecodeError:
+        return None
+
+    results = _worker_pose.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    landmarks = landmarks_to_array(results)
+    return None if landmarks is None else landmarks.tolist()
+
+
+def analyze_video_chunk(path, start, stop, stride=1, max_size=None):
+    """
+    Decode frames [start, stop) of a video (every ``stride``-th one) and run
+    a tracking Pose over them. The worker opens the file itself, so no
+    decoded frames cross the process boundary.
+
+    Returns (n, 33, 4) float32 landmarks with NaN rows where no pose was found.
+    """
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    out = []
+
+    with mp.solutions.pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as pose:
+        for index in range(start, stop):
+            if (index - start) % stride:
+                if not cap.grab():
+                    break
+                continue
+
+            ok, img = cap.read()
+            if not ok:
+                break
+
+            h, w = img.shape[:2]
+            if max_size and max(h, w) > max_size:
+                scale = max_size / max(h, w)
+                img = cv2.resize(img, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+
+            landmarks = landmarks_to_array(pose.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB)))
+            out.append(np.full((33, 4), np.nan, dtype=np.float32) if landmarks is None else landmarks)
+
+    cap.release()
+    return np.stack(out) if out else np.empty((0, 33, 4), dtype=np.float32)
+
+
+# ---------------- Executor ----------------
+# Workers when the caller does not say: each one holds a Pose graph and a
+# TFLite runtime, so one per CPU would crowd out the web workers
+DEFAULT_POSE_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+_executor_workers = 1
+
+
+def get_pose_executor(max_workers=None):
+    """Process pool whose workers each hold one pre-initialised Pose graph."""
+    global _executor, _executor_workers
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor_workers = max_workers or DEFAULT_POSE_WORKERS
+                _executor = ProcessPoolExecutor(
+                    max_workers=_executor_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+    return _executor
+
+
+def discard_pose_executor(executor):
+    """Drop ``executor`` (if still the shared one) so the next call starts a fresh pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_on_pose_executor(work, max_workers=None):
+    """
+    ``work(executor)`` on the shared pool. A worker that died (OOM kill,
+    segfault in native code) breaks the whole pool for good, so it is
+    replaced and the work retried once instead of failing every later call.
+    """
+    executor = get_pose_executor(max_workers)
+    try:
+        return work(executor)
+    except BrokenProcessPool as e:
+        print("POSE WORKER ERROR:", e)
+        discard_pose_executor(executor)
+
+    executor = get_pose_executor(max_workers)
+    try:
+        return work(executor)
+    except BrokenProcessPool:
+        discard_pose_executor(executor)
+        raise
+
+
+def analyze_frames(buffers, max_workers=None):
+    """Run decode + inference for every frame; results keep input order."""
+    buffers = [bytes(b) for b in buffers]
+
+    def work(executor):
+        chunksize = max(1, len(buffers) // (4 * _executor_workers))
+        return list(executor.map(analyze_frame, buffers, chunksize=chunksize))
+
+    return run_on_pose_executor(work, max_workers)
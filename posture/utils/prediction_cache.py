@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+# Memoized predictions kept per process (0 disables the cache)
+PREDICTION_CACHE_SIZE = getattr(settings, "PREDICTION_CACHE_SIZE", 4096)
+# Features closer than this (degrees) share one cached prediction
+PREDICTION_CACHE_STEP = getattr(settings, "PREDICTION_CACHE_STEP", 0.5)
+
+
+# ---------------- Prediction Cache ----------------
+class PredictionCache:
+    """
+    LRU memo of classifier results keyed by exercise, model version and the
+    model's input features quantized to ``step``.
+
+    A user holding a pose sends angles that differ by fractions of a degree,
+    so most of those frames map to one key. When an exercise's active model
+    changes its cached predictions are flushed on the next lookup.
+    """
+
+    def __init__(self, capacity=PREDICTION_CACHE_SIZE, step=PREDICTION_CACHE_STEP):
+        self.capacity = capacity
+        self.step = step
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def key(self, exercise, version, features, names):
+        """Cache key for the ``names`` features the model reads."""
+        values = tuple(round(float(features.get(name, 0)) / self.step) for name in names)
+        return exercise, version, values
+
+    def get(self, key):
+        if not self.capacity:
+            return None
+
+        exercise, version, _ = key
+        with self._lock:
+            if self._versions.get(exercise, version) != version:
+                self._flush(exercise)
+            self._versions[exercise] = version
+
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        if not self.capacity:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+    # ---------------- Internals (lock held) ----------------
+    def _flush(self, exercise):
+        for key in [k for k in self._entries if k[0] == exercise]:
+            del self._entries[key]
+
+
+# ---------------- Global ----------------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PredictionCache()
+    return _cache
@@ -0,0 +1,131 @@
+from collections import deque
+
+from django.conf import settings
+
+# Consecutive frames past a threshold before the state machine switches
+REP_MIN_FRAMES = getattr(settings, "REP_MIN_FRAMES", 2)
+# Completed reps whose accuracy a counter remembers
+REP_HISTORY_LIMIT = getattr(settings, "REP_HISTORY_LIMIT", 500)
+
+GOOD_FORM_ACCURACY = 70
+
+# ---------------- Rep Thresholds ----------------
+# feature driving the rep, angle that starts it, angle that completes it
+REP_THRESHOLDS = {
+    "squats": ("kneeAngle", 120, 160),
+    "bicep curls": ("elbowAngle", 150, 60),
+    "side leg raises": ("legRaiseAngle", 140, 160),
+}
+
+
+# ---------------- Rep Counter ----------------
+class RepCounter:
+    """
+    Incremental angle state machine with hysteresis: a rep starts once the
+    angle has been past ``start`` for ``min_frames`` frames and is counted
+    once it has been past ``end`` for ``min_frames`` frames.
+
+    Each update is O(1); per-rep statistics are running sums, and only the
+    accuracy of the last ``history`` completed reps is kept, so memory is
+    bounded however long the session runs. The returned events carry the
+    full per-rep details for callers that want them.
+    """
+
+    def __init__(self, exercise, min_frames=REP_MIN_FRAMES, history=REP_HISTORY_LIMIT):
+        self.exercise = exercise
+        self.feature, self.start, self.end = REP_THRESHOLDS[exercise]
+        # squats / leg raises start by closing the angle, curls by opening it
+        self.start_below = self.start < self.end
+        self.min_frames = max(1, min_frames)
+        self.in_rep = False
+        self.count = 0
+        self.accuracies = deque(maxlen=history)
+        self._pending = 0
+        self._reset_rep(None)
+
+    def _reset_rep(self, timestamp):
+        self._start_time = timestamp
+        self._frames = 0
+        self._prob_sum = 0.0
+        self._prob_frames = 0
+        self._min_angle = None
+        self._max_angle = None
+
+    def _track(self, angle, prob):
+        self._frames += 1
+        if prob is not None:
+            self._prob_sum += prob
+            self._prob_frames += 1
+        self._min_angle = angle if self._min_angle is None else min(self._min_angle, angle)
+        self._max_angle = angle if self._max_angle is None else max(self._max_angle, angle)
+
+    def update(self, angle, prob=None, timestamp=None):
+        """
+        Feed one frame's angle (and optionally the classifier's P(correct)
+        and a timestamp). Returns the rep event when this frame completes
+        a rep, else None.
+        """
+        if not angle:
+            return None
+
+        if self.in_rep:
+            self._track(angle, prob)
+            crossed = angle > self.end if self.start_below else angle < self.end
+        else:
+            crossed = angle < self.start if self.start_below else angle > self.start
+
+        self._pending = self._pending + 1 if crossed else 0
+        if self._pending < self.min_frames:
+            return None
+        self._pending = 0
+
+        if not self.in_rep:
+            self.in_rep = True
+            self._reset_rep(timestamp)
+            self._track(angle, prob)
+            return None
+
+        self.in_rep = False
+        self.count += 1
+        accuracy = self._prob_sum / self._prob_frames * 100 if self._prob_frames else None
+        event = {
+            "count_number": self.count,
+            "start_time": self._start_time,
+            "end_time": timestamp,
+            "frames": self._frames,
+            "min_angle": round(self._min_angle, 1),
+            "max_angle": round(self._max_angle, 1),
+            "posture_accuracy": None if accuracy is None else round(accuracy, 1),
+        }
+        self.accuracies.append(event["posture_accuracy"])
+        return event
+
+
+def count_reps(exercise, angles, probs=None, timestamps=None, min_frames=REP_MIN_FRAMES):
+    """Run a fresh counter over a whole stream of angles; returns the rep events."""
+    counter = RepCounter(exercise, min_frames)
+    events = []
+    for i, angle in enumerate(angles):
+        event = counter.update(
+            float(angle),
+            None if probs is None else float(probs[i]),
+            None if timestamps is None else float(timestamps[i]),
+        )
+        if event is not None:
+            events.append(event)
+    return events
+
+
+def session_rep_counter(state, exercise):
+    """The session's counter for ``exercise``, started fresh if the exercise changed."""
+    if exercise not in REP_THRESHOLDS:
+        return None
+    if state.rep_counter is None or state.rep_counter.exercise != exercise:
+        state.rep_counter = RepCounter(exercise)
+    return state.rep_counter
+
+
+def rep_feedback(exercise, accuracy):
+    if accuracy >= GOOD_FORM_ACCURACY:
+        return f"Good {exercise} form"
+    return f"Adjust your {exercise} form"
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from django.conf import settings
+
+POSE_SESSION_IDLE_SECONDS = getattr(settings, "POSE_SESSION_IDLE_SECONDS", 120)
+
+
+# ---------------- Session State ----------------
+class PoseSessionState:
+    """What the pose pipeline remembers about one workout session."""
+
+    __slots__ = ("frame_shape", "roi", "landmarks", "smoothed", "fingerprint", "reused",
+                 "rep_counter", "last_seen")
+
+    def __init__(self):
+        self.frame_shape = None   # (height, width) of the full frame
+        self.roi = None           # (x0, y0, x1, y1) normalized crop box
+        self.landmarks = None     # (33, 4) full-frame landmarks of last frame
+        self.smoothed = None      # filtered landmarks of last frame, when smoothing is on
+        self.fingerprint = None   # downsampled grayscale thumbnail of last analysed frame
+        self.reused = 0           # consecutive frames answered from cache
+        self.rep_counter = None   # server-side RepCounter for the session's exercise
+        self.last_seen = time.monotonic()
+
+
+# ---------------- Session Store ----------------
+class SessionStore:
+    """Per-session state keyed by session key, evicted after being idle."""
+
+    def __init__(self, factory=PoseSessionState, idle_seconds=POSE_SESSION_IDLE_SECONDS):
+        self._factory = factory
+        self.idle_seconds = idle_seconds
+        self._states = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def get(self, key):
+        if key is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep > self.idle_seconds / 2:
+                self._sweep(now)
+
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = self._factory()
+            state.last_seen = now
+            return state
+
+    def peek(self, key):
+        """The session's state if it exists, without creating or touching it."""
+        with self._lock:
+            return self._states.get(key)
+
+    def pop(self, key):
+        with self._lock:
+            return self._states.pop(key, None)
+
+    def __len__(self):
+        return len(self._states)
+
+    def _sweep(self, now):
+        expired = [k for k, s in self._states.items() if now - s.last_seen > self.idle_seconds]
+        for key in expired:
+            del self._states[key]
+        self._last_sweep = now
+
+
+# ---------------- Global ----------------
+_sessions = None
+_sessions_lock = threading.Lock()
+
+
+def get_pose_sessions():
+    global _sessions
+    if _sessions is None:
+        with _sessions_lock:
+            if _sessions is None:
+                _sessions = SessionStore()
+    return _sessions
@@ -0,0 +1,154 @@
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from posture.utils.classifier import _predict, get_model_cache, get_shadow_model_cache
+from posture.utils.model_registry import get_model_registry
+
+# Fraction of predict_posture requests re-scored by the shadow candidate (0 disables)
+SHADOW_SAMPLE_RATE = getattr(settings, "SHADOW_SAMPLE_RATE", 0.0)
+# Sampled requests waiting for the shadow worker; more are dropped
+SHADOW_QUEUE_SIZE = getattr(settings, "SHADOW_QUEUE_SIZE", 256)
+
+RECENT_DISAGREEMENTS = 20
+
+
+# ---------------- Stats ----------------
+class ShadowStats:
+    """Fixed-size agreement and latency aggregates for one exercise."""
+
+    def __init__(self):
+        self.samples = 0
+        self.agreements = 0
+        self.prob_diff_sum = 0.0
+        self.active_ms_sum = 0.0
+        self.shadow_ms_sum = 0.0
+        self.active_ms_max = 0.0
+        self.shadow_ms_max = 0.0
+        self.versions = None
+        self.disagreements = deque(maxlen=RECENT_DISAGREEMENTS)
+
+    def add(self, features, active, shadow, active_ms, shadow_ms):
+        self.samples += 1
+        self.agreements += active[0] == shadow[0]
+        self.prob_diff_sum += abs(active[1] - shadow[1])
+        self.active_ms_sum += active_ms
+        self.shadow_ms_sum += shadow_ms
+        self.active_ms_max = max(self.active_ms_max, active_ms)
+        self.shadow_ms_max = max(self.shadow_ms_max, shadow_ms)
+        if active[0] != shadow[0]:
+            self.disagreements.append({"features": features, "active": active, "shadow": shadow})
+
+    def report(self):
+        n = self.samples or 1
+        # stamps are (path, model_id, version, last_updated, mtime)
+        active, shadow = self.versions or (None, None)
+        return {
+            "active_version": active and active[2],
+            "shadow_version": shadow and shadow[2],
+            "samples": self.samples,
+            "agreement": round(self.agreements / n, 4) if self.samples else None,
+            "mean_prob_diff": round(self.prob_diff_sum / n, 4),
+            "active_ms": {"mean": round(self.active_ms_sum / n, 3), "max": round(self.active_ms_max, 3)},
+            "shadow_ms": {"mean": round(self.shadow_ms_sum / n, 3), "max": round(self.shadow_ms_max, 3)},
+            "recent_disagreements": list(self.disagreements),
+        }
+
+
+# ---------------- Shadow Evaluator ----------------
+class ShadowEvaluator:
+    """
+    Scores a sample of live predictions with the exercise's shadow candidate.
+
+    The request thread only enqueues the features (dropping them when the
+    queue is full); a background worker runs the active and the candidate
+    model on the same row, timing both, so user requests never wait on the
+    candidate. Stats restart when either model version changes.
+    """
+
+    def __init__(self, sample_rate=SHADOW_SAMPLE_RATE, queue_size=SHADOW_QUEUE_SIZE):
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, exercise, features):
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return
+        if get_model_registry().resolve(exercise, shadow=True) is None:
+            return
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((exercise, dict(features)))
+        except queue.Full:
+            self.dropped += 1
+
+    def report(self):
+        with self._lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "queued": self._queue.qsize(),
+                "dropped": self.dropped,
+                "exercises": {exercise: stats.report() for exercise, stats in self._stats.items()},
+            }
+
+    # ---------------- Worker ----------------
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="shadow-eval", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            exercise, features = self._queue.get()
+            try:
+                self._evaluate(exercise, features)
+            except Exception as e:
+                print("SHADOW EVAL ERROR:", e)
+
+    def _evaluate(self, exercise, features):
+        active = get_model_cache().get(exercise)
+        shadow = get_shadow_model_cache().get(exercise)
+        if active is None or shadow is None:
+            return
+
+        active_result, active_ms = self._score(active[0], features)
+        shadow_result, shadow_ms = self._score(shadow[0], features)
+
+        versions = (get_model_cache().version(exercise), get_shadow_model_cache().version(exercise))
+        with self._lock:
+            stats = self._stats.get(exercise)
+            if stats is None or stats.versions != versions:
+                stats = self._stats[exercise] = ShadowStats()
+                stats.versions = versions
+            stats.add(features, active_result, shadow_result, active_ms, shadow_ms)
+
+    @staticmethod
+    def _score(bundle, features):
+        start = time.perf_counter()
+        labels, probs = _predict(bundle, [features])
+        elapsed = (time.perf_counter() - start) * 1000
+        return (str(labels[0]), float(probs[0])), elapsed
+
+
+# ---------------- Global ----------------
+_evaluator = None
+_evaluator_lock = threading.Lock()
+
+
+def get_shadow_evaluator():
+    global _evaluator
+    if _evaluator is None:
+        with _evaluator_lock:
+            if _evaluator is None:
+                _evaluator = ShadowEvaluator()
+    return _evaluator
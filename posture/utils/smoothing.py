@@ -0,0 +1,124 @@
+import math
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+POSE_SMOOTHING_FILTER = getattr(settings, "POSE_SMOOTHING_FILTER", "one_euro")
+POSE_SMOOTHING_CAPACITY = getattr(settings, "POSE_SMOOTHING_CAPACITY", 256)
+POSE_SESSION_IDLE_SECONDS = getattr(settings, "POSE_SESSION_IDLE_SECONDS", 120)
+
+# One-Euro filter tuning (normalized coordinates, seconds)
+ONE_EURO_MIN_CUTOFF = getattr(settings, "POSE_ONE_EURO_MIN_CUTOFF", 1.0)
+ONE_EURO_BETA = getattr(settings, "POSE_ONE_EURO_BETA", 0.5)
+ONE_EURO_D_CUTOFF = 1.0
+# Weight of the new frame when the EMA filter is used
+EMA_ALPHA = getattr(settings, "POSE_EMA_ALPHA", 0.5)
+
+NUM_LANDMARKS = 33
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+# ---------------- Smoother Store ----------------
+class LandmarkSmoother:
+    """
+    One-Euro (or EMA) landmark filter state for many sessions at once.
+
+    State lives in preallocated arrays, one row per session, so a worker
+    holds a fixed amount of memory however many sessions come and go. Rows
+    idle for longer than ``idle_seconds`` are recycled; when the store is
+    full the least recently used row is taken over.
+    """
+
+    def __init__(self, capacity=POSE_SMOOTHING_CAPACITY, mode=POSE_SMOOTHING_FILTER,
+                 idle_seconds=POSE_SESSION_IDLE_SECONDS):
+        self.mode = mode
+        self.idle_seconds = idle_seconds
+        self._value = np.zeros((capacity, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._deriv = np.zeros((capacity, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._stamp = np.zeros(capacity, dtype=np.float64)   # time of last sample
+        self._seen = np.zeros(capacity, dtype=np.float64)    # monotonic last access
+        self._rows = {}
+        self._keys = [None] * capacity
+        self._lock = threading.Lock()
+
+    def smooth(self, key, landmarks, timestamp=None):
+        """Filtered copy of (33, 4) landmarks; visibility is passed through."""
+        if landmarks is None:
+            self.pop(key)
+            return None
+
+        now = time.monotonic()
+        timestamp = now if timestamp is None else timestamp
+        raw = landmarks[:, :3]
+
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                row = self._claim(key, now)
+                self._value[row] = raw
+                self._deriv[row] = 0
+            else:
+                dt = timestamp - self._stamp[row]
+                if dt <= 0:
+                    dt = 1 / 30
+                self._filter(row, raw, dt)
+
+            self._stamp[row] = timestamp
+            self._seen[row] = now
+
+            smoothed = landmarks.copy()
+            smoothed[:, :3] = self._value[row]
+            return smoothed
+
+    def pop(self, key):
+        with self._lock:
+            row = self._rows.pop(key, None)
+            if row is not None:
+                self._keys[row] = None
+
+    # ---------------- Internals (lock held) ----------------
+    def _filter(self, row, raw, dt):
+        prev = self._value[row]
+        if self.mode == "ema":
+            self._value[row] = EMA_ALPHA * raw + (1 - EMA_ALPHA) * prev
+            return
+
+        a_d = _alpha(ONE_EURO_D_CUTOFF, dt)
+        deriv = a_d * (raw - prev) / dt + (1 - a_d) * self._deriv[row]
+        cutoff = ONE_EURO_MIN_CUTOFF + ONE_EURO_BETA * np.abs(deriv)
+        tau = 1.0 / (2 * np.pi * cutoff)
+        a = 1.0 / (1.0 + tau / dt)
+        self._value[row] = a * raw + (1 - a) * prev
+        self._deriv[row] = deriv
+
+    def _claim(self, key, now):
+        free = [i for i, k in enumerate(self._keys) if k is None]
+        if not free:
+            stale = np.flatnonzero(now - self._seen > self.idle_seconds)
+            row = int(stale[0]) if len(stale) else int(np.argmin(self._seen))
+            del self._rows[self._keys[row]]
+        else:
+            row = free[0]
+        self._keys[row] = key
+        self._rows[key] = row
+        return row
+
+
+# ---------------- Global ----------------
+_smoother = None
+_smoother_lock = threading.Lock()
+
+
+def get_landmark_smoother():
+    global _smoother
+    if _smoother is None:
+        with _smoother_lock:
+            if _smoother is None:
+                _smoother = LandmarkSmoother()
+    return _smoother
@@ -0,0 +1,164 @@
+import os
+import tempfile
+from datetime import timedelta
+
+import cv2
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from posture.models import Feedback, Repetition, WorkoutSession
+from posture.utils.classifier import classify_rows, get_model_cache
+from posture.utils.features import FEATURE_NAMES, batch_features
+from posture.utils.pose_workers import analyze_video_chunk, run_on_pose_executor
+from posture.utils.reps import REP_THRESHOLDS, count_reps, rep_feedback
+
+# Frames per second actually analysed; higher-fps clips are subsampled
+VIDEO_ANALYSIS_FPS = getattr(settings, "VIDEO_ANALYSIS_FPS", 15)
+# Length of the video slice each worker process decodes and tracks
+VIDEO_CHUNK_SECONDS = getattr(settings, "VIDEO_CHUNK_SECONDS", 10)
+POSE_MAX_INFERENCE_SIZE = getattr(settings, "POSE_MAX_INFERENCE_SIZE", 640)
+POSE_BATCH_WORKERS = getattr(settings, "POSE_BATCH_WORKERS", None)
+
+
+# ---------------- Landmarks ----------------
+def video_info(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError("Could not open video")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)))
+    cap.release()
+    return fps, total, shape
+
+
+def extract_video_landmarks(path, target_fps=VIDEO_ANALYSIS_FPS, chunk_seconds=VIDEO_CHUNK_SECONDS,
+                            max_workers=POSE_BATCH_WORKERS):
+    """
+    Split the clip into chunks and track each chunk in a worker process.
+    Returns ((n, 33, 4) landmarks with NaN rows for missed frames,
+    effective fps, (height, width)).
+    """
+    fps, total, shape = video_info(path)
+    stride = max(1, round(fps / target_fps))
+
+    # some containers do not report a frame count: decode it in one go
+    if total <= 0:
+        chunks = [(0, 2 ** 31)]
+    else:
+        # chunk length is a multiple of stride so sampling stays evenly spaced
+        chunk = max(stride, int(chunk_seconds * fps) // stride * stride)
+        chunks = [(start, min(start + chunk, total)) for start in range(0, total, chunk)]
+
+    def work(executor):
+        futures = [
+            executor.submit(analyze_video_chunk, path, start, stop, stride, POSE_MAX_INFERENCE_SIZE)
+            for start, stop in chunks
+        ]
+        return np.concatenate([f.result() for f in futures])
+
+    landmarks = run_on_pose_executor(work, max_workers)
+    return landmarks, fps / stride, shape
+
+
+# ---------------- Scoring ----------------
+def score_video(path, exercise, **kwargs):
+    """
+    Landmarks -> angle features -> reps for a recorded workout.
+    Each rep's accuracy is the mean classifier P(correct) over its frames.
+    Raises ValueError when the exercise has no rep thresholds or classifier,
+    rather than saving reps whose accuracy is unknown.
+    """
+    if exercise not in REP_THRESHOLDS:
+        raise ValueError(f"Rep counting not supported for {exercise}")
+    # checked before the (slow) pose pass
+    if get_model_cache().get(exercise) is None:
+        raise ValueError(f"No posture model available for {exercise}")
+
+    landmarks, fps, shape = extract_video_landmarks(path, **kwargs)
+    found = ~np.isnan(landmarks[:, 0, 0])
+    frames = np.flatnonzero(found)
+
+    features = batch_features(landmarks[found], shape)
+    rows = [{name: float(features[name][i]) for name in FEATURE_NAMES} for i in range(len(frames))]
+
+    verdicts = classify_rows(exercise, rows)
+    if verdicts is None:
+        raise ValueError(f"No posture model available for {exercise}")
+    p_correct = [prob if label == "correct" else 1 - prob for label, prob in verdicts]
+
+    feature = REP_THRESHOLDS[exercise][0]
+    reps = []
+    for event in count_reps(exercise, features[feature], p_correct, frames / fps):
+        accuracy = event["posture_accuracy"] or 0.0
+        reps.append({
+            "count_number": event["count_number"],
+            "time": event["end_time"],
+            "posture_accuracy": accuracy,
+            "feedback_text": rep_feedback(exercise, accuracy),
+        })
+
+    return {
+        "exercise": exercise,
+        "reps": reps,
+        "duration_seconds": len(landmarks) / fps,
+        "frames_analysed": len(landmarks),
+        "frames_with_pose": int(found.sum()),
+    }
+
+
+# ---------------- Persist ----------------
+def save_video_session(user, exercise, result):
+    """Bulk-write the WorkoutSession, Repetition and Feedback rows for a scored video."""
+    now = timezone.now()
+    duration = timedelta(seconds=result["duration_seconds"])
+
+    with transaction.atomic():
+        session = WorkoutSession.objects.create(
+            user=user,
+            exercise=exercise,
+            start_time=now - duration,
+            end_time=now,
+            duration=duration,
+            device_type="Video",
+            status="Completed"
+        )
+
+        reps = Repetition.objects.bulk_create([
+            Repetition(session=session, count_number=r["count_number"], posture_accuracy=r["posture_accuracy"])
+            for r in result["reps"]
+        ])
+
+        Feedback.objects.bulk_create([
+            Feedback(
+                user=user,
+                session=session,
+                repetition=rep,
+                feedback_text=r["feedback_text"],
+                accuracy_score=r["posture_accuracy"]
+            )
+            for rep, r in zip(reps, result["reps"])
+        ])
+
+    return session
+
+
+def analyze_uploaded_video(upload, user, exercise):
+    """Score an uploaded video file and save it as a completed session."""
+    if hasattr(upload, "temporary_file_path"):
+        result = score_video(upload.temporary_file_path(), exercise.exercise_name.lower())
+    else:
+        suffix = os.path.splitext(upload.name or "")[1] or ".mp4"
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+            for chunk in upload.chunks():
+                tmp.write(chunk)
+        try:
+            result = score_video(tmp.name, exercise.exercise_name.lower())
+        finally:
+            os.remove(tmp.name)
+
+    session = save_video_session(user, exercise, result)
+    return session, result
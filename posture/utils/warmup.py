@@ -0,0 +1,127 @@
+import threading
+import time
+from functools import partial
+
+import numpy as np
+from django.conf import settings
+
+# Preload models and run a synthetic inference when a worker starts
+WARMUP_ON_STARTUP = getattr(settings, "WARMUP_ON_STARTUP", True)
+# First delay before failed components are warmed again (0 disables retries)
+WARMUP_RETRY_SECONDS = getattr(settings, "WARMUP_RETRY_SECONDS", 30)
+WARMUP_RETRY_MAX_SECONDS = 600
+
+WARMUP_FRAME_SIZE = 256
+
+
+# ---------------- Status ----------------
+class WarmupStatus:
+    """Per-component warm state and load time, shown by the readiness endpoint."""
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.components = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds=None, error=None):
+        with self._lock:
+            previous = self.components.get(name)
+            self.components[name] = {
+                "ready": error is None,
+                "seconds": None if seconds is None else round(seconds, 3),
+                "error": error,
+                "attempts": previous["attempts"] + 1 if previous else 1,
+            }
+
+    def ready(self):
+        if not WARMUP_ON_STARTUP:
+            return True
+        with self._lock:
+            return self.finished and all(c["ready"] for c in self.components.values())
+
+    def report(self):
+        ready = self.ready()
+        with self._lock:
+            return {
+                "ready": ready,
+                "warmup_enabled": WARMUP_ON_STARTUP,
+                "started": self.started,
+                "finished": self.finished,
+                "components": dict(self.components),
+            }
+
+
+warmup_status = WarmupStatus()
+
+
+def _timed(name, fn):
+    start = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        print(f"WARMUP ERROR ({name}):", e)
+        warmup_status.record(name, time.perf_counter() - start, str(e))
+        return False
+    warmup_status.record(name, time.perf_counter() - start)
+    return True
+
+
+# ---------------- Components ----------------
+def warm_classifier(exercise):
+    from posture.utils.classifier import _predict, get_model_cache
+
+    cached = get_model_cache().get(exercise)
+    if cached is None:
+        raise ValueError(f"No model found for {exercise}")
+    # synthetic row straight through the model, bypassing the prediction memo
+    _predict(cached[0], [{}])
+
+
+def warm_pose(complexity):
+    from posture.utils.pose_pool import get_pose_pool
+
+    pool = get_pose_pool().tiers[complexity]
+    blank = np.zeros((WARMUP_FRAME_SIZE, WARMUP_FRAME_SIZE, 3), dtype=np.uint8)
+    pool.process(blank)
+
+
+# ---------------- Warmup ----------------
+def run_warmup():
+    from posture.utils.model_registry import get_model_registry
+    from posture.utils.pose_pool import get_pose_pool
+
+    warmup_status.started = True
+    components = {}
+    for exercise in get_model_registry().active_exercises():
+        components[f"classifier:{exercise}"] = partial(warm_classifier, exercise)
+    for complexity in get_pose_pool().tiers:
+        components[f"pose:complexity_{complexity}"] = partial(warm_pose, complexity)
+
+    failed = [name for name, fn in components.items() if not _timed(name, fn)]
+    warmup_status.finished = True
+
+    # a missing artifact or a DB hiccup should not leave the worker unready for good
+    delay = WARMUP_RETRY_SECONDS
+    while failed and delay:
+        time.sleep(delay)
+        failed = [name for name in failed if not _timed(name, components[name])]
+        delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+
+def start_warmup():
+    """
+    Warm this worker in the background; readiness reports 503 until done.
+    Only the server entry points (wsgi.py, asgi.py, api/index.py) call it,
+    so scripts and management commands that set up Django stay cold.
+    """
+    from posture.ai import CHATBOT_LOAD, start_loading
+
+    # the chatbot has fallback replies, so it loads without gating readiness
+    if CHATBOT_LOAD == "startup":
+        start_loading()
+
+    if not WARMUP_ON_STARTUP or warmup_status.started:
+        return
+    warmup_status.started = True
+    threading.Thread(target=run_warmup, name="model-warmup", daemon=True).start()
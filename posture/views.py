@@ -6,20 +6,17 @@ from io import BytesIO
 from random import randint
 from datetime import datetime, timedelta
 import traceback
-import cv2
 import base64
-import numpy as np
 import json
 import os
 import re
 import traceback
-import pandas as pd
-import joblib
 import glob
 
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.core.files.base import ContentFile
+from django.db import transaction
 from django.contrib.auth import get_backends, authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
@@ -29,12 +26,14 @@ from django.views.decorators.csrf import csrf_exempt
 
 # Django REST Framework imports
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, renderer_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 # JWT Authentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 
 # External integrations
@@ -43,7 +42,22 @@ from google.auth.transport import requests as google_requests
 
 # Local imports
 from posture.utils.model_loader import load_active_model
-from .ai import generate_response
+from posture.utils.classifier import classify_batch, classify_posture
+from posture.utils.model_registry import MODEL_DIR
+from posture.utils.frames import FrameDecodeError, read_frame, read_frames, request_timestamp
+from posture.utils.landmarks import array_to_list, encode_landmarks, joint_indices, negotiate_format
+from posture.utils.pose_pipeline import finish_frame, prepare_frame, score_frame
+from posture.utils.pose_pool import PosePoolTimeout, get_pose_pool, pose_session_key
+from posture.utils.pose_workers import analyze_frames
+from posture.utils.prediction_cache import get_prediction_cache
+from posture.utils.reps import rep_feedback, session_rep_counter
+from posture.utils.sessions import get_pose_sessions
+from posture.utils.shadow import get_shadow_evaluator
+from posture.utils.smoothing import get_landmark_smoother
+from posture.utils.video import analyze_uploaded_video
+from posture.utils.warmup import warmup_status
+from .ai import chatbot_status, generate_response
+from .renderers import POSE_RENDERERS
 from .models import (
     ChatMessage, ChatSession, Contact, Profile, Exercise, TrainingData,
     WorkoutSession, Repetition, Report, Feedback, AIModel
@@ -175,6 +189,23 @@ def exercises_api(request):
     ]
     return JsonResponse(data, safe=False)
 
+# ---------------------------
+# READINESS
+# ---------------------------
+@api_view(['GET'])
+def ready_api(request):
+    """
+    GET /api/ready/
+    200 once this worker has preloaded its classifiers and MediaPipe, 503
+    while it is still warming up; lists each component's status and load time.
+    The chatbot's load status and this worker's prediction memo hit rate
+    are reported but do not affect readiness.
+    """
+    report = warmup_status.report()
+    report["chatbot"] = chatbot_status()
+    report["prediction_cache"] = get_prediction_cache().stats()
+    return Response(report, status=200 if report["ready"] else 503)
+
 # ---------------------------
 # AUTHENTICATION
 # ---------------------------
@@ -479,6 +510,13 @@ def save_workout_session_api(request):
                 session.duration = timedelta(seconds=duration_seconds)
             session.status = "Completed"
             session.save()
+            session_key = pose_session_key(request.user, session.session_id)
+            get_pose_pool().release_session(session_key)
+            get_landmark_smoother().pop(session_key)
+            # counted reps stay until save_repetitions_api collects them (or the session idles out)
+            state = get_pose_sessions().peek(session_key)
+            if state is None or state.rep_counter is None or not state.rep_counter.count:
+                get_pose_sessions().pop(session_key)
         else:
             session = WorkoutSession.objects.create(user=request.user, exercise_id=exercise_id, start_time=timezone.now(), end_time=None, duration=None, device_type="Webcam", status="In Progress")
         return JsonResponse({"success": True, "session_id": session.session_id})
@@ -498,25 +536,64 @@ def save_repetitions_api(request):
         session_id = data.get("session_id")
         reps = data.get("reps", [])
         session = get_object_or_404(WorkoutSession, pk=session_id)
-
-        for i, r in enumerate(reps, start=1):
-            rep = Repetition.objects.create(
-                session=session,
-                count_number=i,
-                posture_accuracy=r.get("posture_accuracy", 0)
-            )
-
-            Feedback.objects.create(
-                user=session.user,
-                session=session,
-                repetition=rep,
-                feedback_text=r.get("feedback_text"),
-                accuracy_score=r.get("posture_accuracy"),
-            )
+        server_reps = bool(data.get("server_reps"))
+        first = 1
+
+        with transaction.atomic():
+            # thin clients can let the server-side rep counter decide the reps
+            if server_reps:
+                # row lock serializes concurrent saves of the same session
+                session = WorkoutSession.objects.select_for_update().get(pk=session.pk)
+                reps = server_rep_list(request.user, session)
+                first = session.repetitions.count() + 1
+
+            for i, r in enumerate(reps, start=first):
+                rep = Repetition.objects.create(
+                    session=session,
+                    count_number=i,
+                    posture_accuracy=r.get("posture_accuracy", 0)
+                )
+
+                Feedback.objects.create(
+                    user=session.user,
+                    session=session,
+                    repetition=rep,
+                    feedback_text=r.get("feedback_text"),
+                    accuracy_score=r.get("posture_accuracy"),
+                )
+
+            if server_reps:
+                consume_server_reps(request.user, session, len(reps))
         return JsonResponse({"success": True})
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
 
+def server_rep_list(user, session):
+    # counters live in this worker's memory: needs sticky routing per session
+    state = get_pose_sessions().peek(pose_session_key(user, session.session_id))
+    if state is None or state.rep_counter is None:
+        return []
+    return [
+        {
+            "posture_accuracy": accuracy or 0,
+            "feedback_text": rep_feedback(state.rep_counter.exercise, accuracy or 0)
+        }
+        for accuracy in list(state.rep_counter.accuracies)
+    ]
+
+def consume_server_reps(user, session, saved):
+    # drop the reps just written so a retried save doesn't store them again;
+    # reps completed since server_rep_list ran stay queued for the next save
+    key = pose_session_key(user, session.session_id)
+    if session.status == "Completed":
+        get_pose_sessions().pop(key)
+        return
+    state = get_pose_sessions().peek(key)
+    if state is None or state.rep_counter is None:
+        return
+    for _ in range(min(saved, len(state.rep_counter.accuracies))):
+        state.rep_counter.accuracies.popleft()
+
 # ---------------------------
 # SAVE FEEDBACK
 # ---------------------------
@@ -601,33 +678,152 @@ def download_report(request, report_id):
         response['Content-Disposition'] = f'attachment; filename="report_session_{session_id}.pdf"'
         return response
 
+
 # ---------------------------
 # MEDIAPIPE POSE ANALYSIS
 # ---------------------------
-os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
-import mediapipe as mp
-mp_pose = mp.solutions.pose
-mp_drawing = mp.solutions.drawing_utils
+def landmarks_response(request, landmarks, options, smoothed=None, **extra):
+    """
+    JSON by default; packed float16/float32 or msgpack when the client asks
+    for it in the Accept header. ``exercise`` (or ``joints``) in the request
+    options limits compact responses to that exercise's joints.
+
+    Every response carries a ``backpressure`` hint (next frame interval and
+    resolution) so clients slow down before this worker saturates.
+    """
+    extra["backpressure"] = get_pose_pool().load.advice()
+    media_type = negotiate_format(request.META.get("HTTP_ACCEPT"))
+    if media_type is None:
+        if smoothed is not None:
+            extra["smoothed_landmarks"] = array_to_list(smoothed)
+        return JsonResponse({"landmarks": array_to_list(landmarks), **extra})
+
+    indices = joint_indices(options.get("joints") or options.get("exercise"))
+    body, headers = encode_landmarks(landmarks, media_type, indices, extra, smoothed)
+    response = HttpResponse(body, content_type=media_type)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def smooth_landmarks(session_key, landmarks, options):
+    """
+    Temporally filtered landmarks for the session, or None when smoothing
+    is off. Clients opt in with ``smooth=1`` (POSE_SMOOTHING_DEFAULT turns
+    it on for everyone) and may send a ``timestamp`` in milliseconds.
+    """
+    smooth = str(options.get("smooth", settings.POSE_SMOOTHING_DEFAULT)).lower()
+    if session_key is None or smooth not in ("1", "true", "yes"):
+        return None
+
+    return get_landmark_smoother().smooth(session_key, landmarks, request_timestamp(options))
+
 
 @login_required
 @csrf_exempt
 @api_view(['POST'])
+@renderer_classes(POSE_RENDERERS)
 def analyze_pose_api(request):
-    body = request.data
-    frame_data = body['frame'].split(",")[1]
-    frame_bytes = base64.b64decode(frame_data)
-    np_arr = np.frombuffer(frame_bytes, np.uint8)
-    img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+    # accepts raw image bytes, multipart, or the legacy base64 JSON body
+    try:
+        frame_buffer, options = read_frame(request)
+    except FrameDecodeError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    # reuse a pooled Pose graph, pinned to the workout session for tracking
+    session_key = pose_session_key(request.user, options.get("session_id"))
+    state = get_pose_sessions().get(session_key)
 
-    landmarks_list = []
+    # downscaled decode + crop around the previous frame's landmarks
+    try:
+        rgb, roi, _ = prepare_frame(frame_buffer, state)
+    except FrameDecodeError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    # near-duplicate of the last frame (e.g. holding a squat): skip inference
+    reused = rgb is None
+    if reused:
+        landmarks = state.landmarks
+    else:
+        try:
+            exercise = (options.get("exercise") or "").lower().strip()
+            results = get_pose_pool().process(rgb, session_key, exercise)
+        except PosePoolTimeout:
+            return JsonResponse({
+                "error": "Pose analysis busy, retry shortly",
+                "backpressure": get_pose_pool().load.advice()
+            }, status=503)
+        landmarks = finish_frame(results, roi, state)
 
-    with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as pose:
-        results = pose.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-        if results.pose_landmarks:
-            lm = results.pose_landmarks.landmark
-            landmarks_list = [{"x": l.x, "y": l.y} for l in lm]
+    smoothed = smooth_landmarks(session_key, landmarks, options)
 
-    return JsonResponse({"landmarks": landmarks_list})
+    return landmarks_response(request, landmarks, options, smoothed, reused=reused)
+
+@login_required
+@csrf_exempt
+@api_view(['POST'])
+def analyze_pose_batch_api(request):
+    """
+    POST /api/analyze_pose_batch/
+    Takes a burst of frames (multipart ``frames`` files or a JSON ``frames``
+    list) and returns one [33][x, y, z, visibility] landmark tensor per
+    frame, in order. Frames with no detected pose come back as null.
+    """
+    try:
+        buffers, _ = read_frames(request)
+    except FrameDecodeError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if not buffers:
+        return JsonResponse({"error": "No frames provided"}, status=400)
+    if len(buffers) > settings.POSE_BATCH_MAX_FRAMES:
+        return JsonResponse({"error": f"At most {settings.POSE_BATCH_MAX_FRAMES} frames per batch"}, status=400)
+
+    landmarks = analyze_frames(buffers, settings.POSE_BATCH_WORKERS)
+
+    return JsonResponse({
+        "fields": ["x", "y", "z", "visibility"],
+        "landmarks": landmarks
+    })
+
+# ---------------------------
+# RECORDED VIDEO ANALYSIS
+# ---------------------------
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def analyze_video_api(request):
+    """
+    POST /api/analyze_video/
+    Multipart upload of a recorded workout (``video`` file + ``exercise_id``).
+    The clip is scored offline and saved as a completed session with its
+    repetitions and feedback.
+    """
+    upload = request.FILES.get("video")
+    if not upload:
+        return JsonResponse({"success": False, "error": "Video file required"}, status=400)
+
+    try:
+        exercise_id = int(request.data.get("exercise_id"))
+    except (TypeError, ValueError):
+        return JsonResponse({"success": False, "error": "Valid exercise_id required"}, status=400)
+    exercise = get_object_or_404(Exercise, pk=exercise_id)
+
+    try:
+        session, result = analyze_uploaded_video(upload, request.user, exercise)
+    except ValueError as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+    except Exception as e:
+        traceback.print_exc()
+        return JsonResponse({"success": False, "error": str(e)}, status=500)
+
+    return JsonResponse({
+        "success": True,
+        "session_id": session.session_id,
+        "total_reps": len(result["reps"]),
+        "reps": result["reps"],
+        "duration_seconds": result["duration_seconds"]
+    })
 
 # ---------------------------
 # CHATBOT
@@ -711,7 +907,8 @@ def chat_api(request):
 
         return JsonResponse({
             "reply": reply_text,
-            "session_id": session.chatSession_id
+            "session_id": session.chatSession_id,
+            "model_status": chatbot_status()["state"]
         })
 
     except Exception:
@@ -755,52 +952,6 @@ def collect_training_data(request):
 
     return Response({"success": True})
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-MODEL_DIR = os.path.join(BASE_DIR, "ml_models")
-
-
-# ---------------- FIND LATEST MODEL ----------------
-def find_latest_model(exercise_name):
-    try:
-        exercise_name = exercise_name.lower().replace(" ", "")
-
-        models = []
-
-        for file in os.listdir(MODEL_DIR):
-            f = file.lower().replace(" ", "")
-
-            if exercise_name in f and f.endswith(".pkl") and "model" in f:
-                models.append(file)
-
-        if not models:
-            return None
-
-        # pick latest version (timestamp at end)
-        models.sort(reverse=True)
-        return os.path.join(MODEL_DIR, models[0])
-
-    except Exception as e:
-        print("FILE SEARCH ERROR:", e)
-        return None
-
-
-def find_scaler(exercise_name):
-    try:
-        exercise_name = exercise_name.lower().replace(" ", "")
-
-        for file in os.listdir(MODEL_DIR):
-            f = file.lower().replace(" ", "")
-
-            if exercise_name in f and "scaler" in f:
-                return os.path.join(MODEL_DIR, file)
-
-        return None
-
-    except Exception as e:
-        print("SCALER SEARCH ERROR:", e)
-        return None
-
-
 # ---------------- VIEW ----------------
 @api_view(["POST"])
 def predict_posture(request):
@@ -812,66 +963,194 @@ def predict_posture(request):
         if not isinstance(features, dict):
             return Response({"error": "Invalid features"}, status=400)
 
-        model_path = find_latest_model(exercise)
+        result = classify_posture(exercise, features)
 
-        if not model_path:
+        if result is None:
             return Response({
                 "error": f"No model found for {exercise}",
                 "files_in_dir": os.listdir(MODEL_DIR)
             }, status=500)
 
-        bundle = joblib.load(model_path)
-
-        model = bundle["model"]          # actual ML model
-        feature_list = bundle["features"]  # correct feature order
+        # sampled copy for the shadow candidate, scored off the request path
+        get_shadow_evaluator().submit(exercise, features)
 
-        # ---------------- BASE FEATURES ----------------
-        knee = float(features.get("kneeAngle", 0))
-        hip = float(features.get("hipAngle", 0))
-        elbow = float(features.get("elbowAngle", 0))
-        leg = float(features.get("legRaiseAngle", 0))
+        return Response(result)
 
-        # ---------------- ENGINEERED FEATURES ----------------
-        X = pd.DataFrame([{
-            "kneeAngle": knee,
-            "hipAngle": hip,
-            "elbowAngle": elbow,
-            "legRaiseAngle": leg,
-
-            "knee_hip_diff": abs(knee - hip),
-            "hip_elbow_diff": abs(hip - elbow),
-            "knee_elbow_diff": abs(knee - elbow),
-
-            "body_balance": (knee + hip) / 2,
-            "posture_stability": (knee + hip + elbow) / 3,
-
-            "knee_depth": 180 - knee,
-            "hip_opening": hip - 90,
-            "arm_fold_ratio": elbow / 180
-        }])
+    except Exception as e:
+        print("PREDICT ERROR:", e)
+        return Response({"error": str(e)}, status=500)
 
-        # extract correct values in correct order
-        input_data = [X.iloc[0][f] if f in X.columns else 0 for f in feature_list]
 
-        # ensure correct shape
-        input_array = np.array(input_data).reshape(1, -1)
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication, JWTAuthentication])
+@permission_classes([IsAdminUser])
+def shadow_stats_api(request):
+    """
+    GET /api/shadow_stats/
+    Agreement and latency of each exercise's shadow candidate against the
+    active model, from this worker's sampled traffic. Staff use their
+    Django admin login session, since login_api only issues tokens to
+    regular users.
+    """
+    return Response(get_shadow_evaluator().report())
 
-        # predict
-        pred = model.predict(input_array)[0]
 
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(input_array)[0]
-            prob = float(proba[int(pred)])
-        else:
-            prob = 1.0
+@api_view(["POST"])
+def predict_posture_batch(request):
+    """
+    POST /api/predict_posture_batch/
+    Body: ``rows`` - a list of feature dicts, or of ``{"exercise", "features"}``
+    objects when exercises are mixed - and an optional default ``exercise``.
+    Returns one prediction per row, in order; rows whose exercise has no
+    model come back with an ``error``.
+    """
+    try:
+        data = request.data
+        rows = data.get("rows")
+        default_exercise = (data.get("exercise") or "").lower().strip()
+
+        if not isinstance(rows, list) or not rows:
+            return Response({"error": "rows must be a non-empty list"}, status=400)
+        if len(rows) > settings.PREDICT_BATCH_MAX_ROWS:
+            return Response({"error": f"At most {settings.PREDICT_BATCH_MAX_ROWS} rows per batch"}, status=400)
+
+        pairs = []
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                return Response({"error": f"rows[{i}]: invalid features"}, status=400)
+            if isinstance(row.get("features"), dict):
+                exercise = (row.get("exercise") or default_exercise).lower().strip()
+                features = row["features"]
+            else:
+                exercise, features = default_exercise, row
+
+            # one bad value would otherwise fail the whole batch inside the model
+            for name, value in features.items():
+                try:
+                    float(value)
+                except (TypeError, ValueError):
+                    return Response({"error": f"rows[{i}]: '{name}' must be a number"}, status=400)
+            pairs.append((exercise, features))
+
+        results = classify_batch(pairs)
 
         return Response({
-            "label": "correct" if int(pred) == 1 else "incorrect",
-            "prob": prob,
-            "exercise": exercise,
-            "model_used": os.path.basename(model_path)
+            "results": [
+                result or {"error": f"No model found for {exercise}", "exercise": exercise}
+                for result, (exercise, _) in zip(results, pairs)
+            ]
         })
 
     except Exception as e:
         print("PREDICT ERROR:", e)
-        return Response({"error": str(e)}, status=500)
\ No newline at end of file
+        return Response({"error": str(e)}, status=500)
+
+
+# ---------------- ANALYZE + PREDICT ----------------
+@login_required
+@csrf_exempt
+@api_view(["POST"])
+@renderer_classes(POSE_RENDERERS)
+def analyze_and_predict_api(request):
+    """
+    POST /api/analyze_and_predict/
+    One round trip per frame: pose landmarks, the same angle features the
+    frontend's extractFeatures() computes, and the exercise classifier's
+    verdict. Takes the same frame formats as analyze_pose_api plus
+    ``exercise`` and ``session_id``.
+    """
+    try:
+        frame_buffer, options = read_frame(request)
+    except FrameDecodeError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    exercise = (options.get("exercise") or "").lower().strip()
+    session_key = pose_session_key(request.user, options.get("session_id"))
+    state = get_pose_sessions().get(session_key)
+    prev_landmarks = state.landmarks if state is not None else None
+
+    try:
+        rgb, roi, frame_shape = prepare_frame(frame_buffer, state)
+    except FrameDecodeError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    reused = rgb is None
+    if reused:
+        landmarks = state.landmarks
+    else:
+        try:
+            results = get_pose_pool().process(rgb, session_key, exercise)
+        except PosePoolTimeout:
+            return JsonResponse({
+                "error": "Pose analysis busy, retry shortly",
+                "backpressure": get_pose_pool().load.advice()
+            }, status=503)
+        landmarks = finish_frame(results, roi, state)
+
+    smoothed = smooth_landmarks(session_key, landmarks, options)
+
+    if landmarks is None:
+        return landmarks_response(request, None, options, reused=reused, features=None, label="unknown", prob=0)
+
+    # server-side rep counting for the session
+    counter = session_rep_counter(state, exercise) if state is not None else None
+    # classify the filtered pose when smoothing is on, so verdicts do not flicker
+    if smoothed is not None:
+        features, verdict, rep = score_frame(exercise, smoothed, frame_shape, state.smoothed,
+                                             counter, request_timestamp(options))
+        state.smoothed = smoothed
+    else:
+        features, verdict, rep = score_frame(exercise, landmarks, frame_shape, prev_landmarks,
+                                             counter, request_timestamp(options))
+
+    return landmarks_response(request, landmarks, options, smoothed, reused=reused, features=features, rep=rep, **verdict)
+
+
+# ---------------- REP STREAM ----------------
+@csrf_exempt
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def rep_stream_api(request):
+    """
+    POST /api/rep_stream/
+    Feed a session's angle features to the server-side rep counter.
+    Body: ``session_id``, ``exercise`` and ``samples`` - a list of feature
+    dicts, each optionally carrying ``prob`` (P(correct)) and ``timestamp``
+    (ms). Returns the reps completed by these samples and the running count.
+    """
+    data = request.data
+    exercise = (data.get("exercise") or "").lower().strip()
+    session_key = pose_session_key(request.user, data.get("session_id"))
+    samples = data.get("samples")
+    if samples is None and isinstance(data.get("features"), dict):
+        samples = [data["features"]]
+
+    if session_key is None:
+        return Response({"error": "session_id required"}, status=400)
+    if not isinstance(samples, list):
+        return Response({"error": "Invalid samples"}, status=400)
+
+    counter = session_rep_counter(get_pose_sessions().get(session_key), exercise)
+    if counter is None:
+        return Response({"error": f"Rep counting not supported for {exercise}"}, status=400)
+
+    # parse every sample before feeding any, so a bad one leaves the counter untouched
+    try:
+        frames = [
+            (
+                float(sample.get(counter.feature) or 0),
+                None if sample.get("prob") is None else float(sample["prob"]),
+                request_timestamp(sample),
+            )
+            for sample in samples
+        ]
+    except (AttributeError, TypeError, ValueError):
+        return Response({"error": "Invalid samples"}, status=400)
+
+    events = []
+    for angle, prob, timestamp in frames:
+        event = counter.update(angle, prob, timestamp)
+        if event:
+            events.append(event)
+
+    return Response({"events": events, "rep_count": counter.count, "in_rep": counter.in_rep})
\ No newline at end of file
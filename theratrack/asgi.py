@@ -2,6 +2,9 @@
 ASGI config for physiocoach project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests go to Django; the live pose stream is served as a websocket
+on ``/ws/pose/``. Pose, prediction and chat views are served as async
+variants here so slow inference does not block the other endpoints.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,5 +15,24 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'theratrack.settings')
+# inference views become async and run on their own executors
+os.environ.setdefault('INFERENCE_ASYNC_VIEWS', 'True')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# imported after Django is set up
+from posture.streaming import CLOSE_NOT_FOUND, POSE_STREAM_PATH, pose_stream
+from posture.utils.warmup import start_warmup
+
+# preload classifiers and MediaPipe; /api/ready/ answers 503 until done
+start_warmup()
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        if scope["path"].rstrip("/") == POSE_STREAM_PATH.rstrip("/"):
+            return await pose_stream(scope, receive, send)
+        await send({"type": "websocket.close", "code": CLOSE_NOT_FOUND})
+        return
+
+    return await django_application(scope, receive, send)
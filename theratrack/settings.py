@@ -88,6 +88,14 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+# Let the frontend read the headers describing compact landmark responses
+CORS_EXPOSE_HEADERS = [
+    "X-Landmark-Fields",
+    "X-Landmark-Count",
+    "X-Landmark-Sets",
+    "X-Landmark-Indices",
+    "X-Pose-Meta",
+]
 SESSION_COOKIE_SAMESITE = "Lax"
 CSRF_COOKIE_SAMESITE = "Lax"
 SESSION_COOKIE_SECURE = False
@@ -176,6 +184,117 @@ LOGIN_REDIRECT_URL = '/'
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# ----------------------
+# POSE ANALYSIS
+# ----------------------
+# Number of long-lived MediaPipe Pose instances kept per worker process
+POSE_POOL_SIZE = int(os.getenv("POSE_POOL_SIZE", 2))
+# Seconds a request waits for a free Pose instance before returning 503
+POSE_CHECKOUT_TIMEOUT = float(os.getenv("POSE_CHECKOUT_TIMEOUT", 5))
+# MediaPipe model_complexity (0 lite, 1 full, 2 heavy). With tiering on, each
+# request gets the heaviest model whose measured latency fits the budget
+POSE_MODEL_COMPLEXITY = int(os.getenv("POSE_MODEL_COMPLEXITY", 1))
+POSE_COMPLEXITY_TIERING = os.getenv("POSE_COMPLEXITY_TIERING", "False") == "True"
+POSE_LATENCY_BUDGET_MS = float(os.getenv("POSE_LATENCY_BUDGET_MS", 50))
+# Lowest complexity per exercise, e.g. "squats:1,side leg raises:1"
+POSE_COMPLEXITY_FLOORS = {
+    name.strip().lower(): int(level)
+    for name, level in (
+        item.rsplit(":", 1) for item in os.getenv("POSE_COMPLEXITY_FLOORS", "").split(",") if item.strip()
+    )
+}
+# Process pool used by the batch endpoint and video analysis. Kept small:
+# every gunicorn worker starts its own pool, each process holding a Pose graph
+POSE_BATCH_WORKERS = int(os.getenv("POSE_BATCH_WORKERS", 2))
+POSE_BATCH_MAX_FRAMES = int(os.getenv("POSE_BATCH_MAX_FRAMES", 30))
+# Backpressure hints: latency target, normal and maximum recommended frame interval
+POSE_TARGET_LATENCY_MS = float(os.getenv("POSE_TARGET_LATENCY_MS", 60))
+POSE_FRAME_INTERVAL_MS = int(os.getenv("POSE_FRAME_INTERVAL_MS", 100))
+POSE_MAX_FRAME_INTERVAL_MS = int(os.getenv("POSE_MAX_FRAME_INTERVAL_MS", 1000))
+# Per-session pose state (previous landmarks, crop box) is dropped after this idle time
+POSE_SESSION_IDLE_SECONDS = int(os.getenv("POSE_SESSION_IDLE_SECONDS", 120))
+# Longest side in px of the image given to MediaPipe (0 keeps the client resolution)
+POSE_MAX_INFERENCE_SIZE = int(os.getenv("POSE_MAX_INFERENCE_SIZE", 640))
+# Crop each frame to a padded box around the previous frame's landmarks
+POSE_ROI_CROP = os.getenv("POSE_ROI_CROP", "True") == "True"
+POSE_ROI_PADDING = float(os.getenv("POSE_ROI_PADDING", 0.3))
+# Near-duplicate frames (mean grayscale difference below the threshold) reuse the
+# previous landmarks, at most POSE_DEDUP_MAX_REUSE times in a row (0 disables)
+POSE_DEDUP_THRESHOLD = float(os.getenv("POSE_DEDUP_THRESHOLD", 2.0))
+POSE_DEDUP_MAX_REUSE = int(os.getenv("POSE_DEDUP_MAX_REUSE", 5))
+# Temporal landmark smoothing ("one_euro" or "ema"); clients opt in with smooth=1
+POSE_SMOOTHING_FILTER = os.getenv("POSE_SMOOTHING_FILTER", "one_euro")
+POSE_SMOOTHING_DEFAULT = os.getenv("POSE_SMOOTHING_DEFAULT", "False") == "True"
+# Number of sessions whose filter state is kept per worker
+POSE_SMOOTHING_CAPACITY = int(os.getenv("POSE_SMOOTHING_CAPACITY", 256))
+# Recorded video analysis: frames per second analysed and seconds of video per worker task
+VIDEO_ANALYSIS_FPS = float(os.getenv("VIDEO_ANALYSIS_FPS", 15))
+VIDEO_CHUNK_SECONDS = float(os.getenv("VIDEO_CHUNK_SECONDS", 10))
+# Server-side rep counter: frames past a threshold before its state switches
+REP_MIN_FRAMES = int(os.getenv("REP_MIN_FRAMES", 2))
+# Completed reps whose accuracy a session's counter remembers for server_reps saves.
+# Counters live in the worker process that saw the frames, so a multi-worker
+# deployment must route a session's requests to one worker (sticky sessions).
+REP_HISTORY_LIMIT = int(os.getenv("REP_HISTORY_LIMIT", 500))
+
+# ----------------------
+# INFERENCE EXECUTORS
+# ----------------------
+# Serve the pose, batch/video, predict_posture and chat views as async views that
+# await their work on dedicated thread pools (asgi.py switches this on)
+INFERENCE_ASYNC_VIEWS = os.getenv("INFERENCE_ASYNC_VIEWS", "False") == "True"
+INFERENCE_EXECUTOR_WORKERS = {
+    "pose": POSE_POOL_SIZE,
+    "predict": int(os.getenv("PREDICT_EXECUTOR_WORKERS", 2)),
+    # batch and video requests mostly wait on the pose process pool
+    "video": int(os.getenv("VIDEO_EXECUTOR_WORKERS", 2)),
+    "chat": int(os.getenv("CHAT_EXECUTOR_WORKERS", 1)),
+}
+# Requests allowed to wait per executor before new ones get a 503
+INFERENCE_QUEUE_LIMIT = int(os.getenv("INFERENCE_QUEUE_LIMIT", 16))
+
+# ----------------------
+# POSTURE CLASSIFIER
+# ----------------------
+# Loaded classifiers are cached per process; their file mtime and active
+# AIModel row are re-checked at most this often (seconds)
+MODEL_CACHE_CHECK_SECONDS = float(os.getenv("MODEL_CACHE_CHECK_SECONDS", 5))
+# Largest number of feature rows accepted by one batch prediction request
+PREDICT_BATCH_MAX_ROWS = int(os.getenv("PREDICT_BATCH_MAX_ROWS", 5000))
+# Evaluate random forests from flattened arrays (exported by train_model.py or
+# "manage.py export_forests") instead of through sklearn
+CLASSIFIER_FLAT_FOREST = os.getenv("CLASSIFIER_FLAT_FOREST", "True") == "True"
+# Batches with more rows than this use sklearn instead. Measured on the shipped
+# 100-tree squats model: 1 row 0.07 ms vs 10 ms, 1000 rows ~15 ms each,
+# 5000 rows 59 ms vs 25 ms (flat vs sklearn)
+CLASSIFIER_FLAT_MAX_ROWS = int(os.getenv("CLASSIFIER_FLAT_MAX_ROWS", 1000))
+# Serve exported forests memory-mapped read-only, shared by all worker processes
+CLASSIFIER_MMAP = os.getenv("CLASSIFIER_MMAP", "True") == "True"
+# LRU of recent predictions keyed by features rounded to PREDICTION_CACHE_STEP
+# degrees; flushed when the active model changes (size 0 disables)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 4096))
+PREDICTION_CACHE_STEP = float(os.getenv("PREDICTION_CACHE_STEP", 0.5))
+# Preload every active classifier and a Pose instance per model tier when a
+# worker starts; /api/ready/ answers 503 until they have run once
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "True") == "True"
+# Components that failed to warm are retried after this many seconds, doubling
+# up to 10 minutes between attempts (0 disables retries)
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", 30))
+# Shadow candidates (train_model.py --shadow) re-score this fraction of
+# predict_posture requests in a background thread
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", 0.0))
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", 256))
+
+# ----------------------
+# CHATBOT
+# ----------------------
+# When TinyLlama/MiniLM load, always in a background thread: "startup" (server
+# start), "lazy" (first chat message) or "off". Chat gets quick fallback
+# replies until they are ready
+CHATBOT_LOAD = os.getenv("CHATBOT_LOAD", "lazy")
+# After a failed load, the next chat message this many seconds later retries it
+CHATBOT_RETRY_SECONDS = float(os.getenv("CHATBOT_RETRY_SECONDS", 300))
+
 # ----------------------
 # DEFAULT AUTO FIELD
 # ----------------------
@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import include, path
 from django.conf import settings
 from posture import views
+from posture.utils.offload import inference_view
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
 
@@ -35,6 +36,7 @@ urlpatterns = [
     path('auth/', include('social_django.urls', namespace='social')),
     path('api/current_user/', views.current_user, name='current_user'),
     path('api/contact/', views.contact_api, name='contact_api'),
+    path('api/ready/', views.ready_api, name='ready_api'),
 
     # Protected APIs (login required)
     path('api/profile/', views.ProfileAPIView.as_view(), name='profile_api'),
@@ -52,13 +54,19 @@ urlpatterns = [
     path('api/save_report/', views.save_report_api, name='save_report_api'),
     path("api/download_report/<int:report_id>/", views.download_report, name="download_report"),
     # Pose Analysis
-    path('api/analyze_pose/', views.analyze_pose_api, name='analyze_pose_api'),
+    path('api/analyze_pose/', inference_view(views.analyze_pose_api, "pose"), name='analyze_pose_api'),
+    path('api/analyze_pose_batch/', inference_view(views.analyze_pose_batch_api, "video"), name='analyze_pose_batch_api'),
+    path('api/analyze_video/', inference_view(views.analyze_video_api, "video"), name='analyze_video_api'),
 
     # Chatbot
-    path('api/chat/', views.chat_api, name='chat_api'),
+    path('api/chat/', inference_view(views.chat_api, "chat"), name='chat_api'),
 
     path("api/collect_training_data/", views.collect_training_data, name='collect_training_data'),
-    path("api/predict_posture/", views.predict_posture, name="predict_posture")
+    path("api/predict_posture/", inference_view(views.predict_posture, "predict"), name="predict_posture"),
+    path("api/predict_posture_batch/", inference_view(views.predict_posture_batch, "predict"), name="predict_posture_batch"),
+    path("api/shadow_stats/", views.shadow_stats_api, name="shadow_stats_api"),
+    path("api/analyze_and_predict/", inference_view(views.analyze_and_predict_api, "pose"), name="analyze_and_predict_api"),
+    path("api/rep_stream/", views.rep_stream_api, name="rep_stream_api")
 ]
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'theratrack.settings')
 
 application = get_wsgi_application()
+
+# preload classifiers and MediaPipe; /api/ready/ answers 503 until done
+from posture.utils.warmup import start_warmup
+
+start_warmup()
@@ -1,4 +1,5 @@
 import os
+import sys
 import django
 import pandas as pd
 import joblib
@@ -13,6 +14,8 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theratrack.settings")
 django.setup()
 
 from posture.models import AIModel
+from posture.utils.forest import export_forest
+from posture.utils.model_registry import artifact_name, file_checksum
 
 # ---------------- PATH SETUP ----------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -20,6 +23,9 @@ DATA_PATH = os.path.join(os.path.dirname(__file__), "dataset.csv")
 MODEL_DIR = os.path.join(BASE_DIR, "ml_models")
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# --shadow registers the new models as shadow candidates instead of activating them
+SHADOW = "--shadow" in sys.argv[1:]
+
 # ---------------- LOAD DATA ----------------
 df = pd.read_csv(DATA_PATH)
 
@@ -143,20 +149,28 @@ for exercise_name in df["exercise"].unique():
         "features": FEATURES
     }
 
-    model_path = os.path.join(MODEL_DIR, f"{exercise_name}_model_{version}.pkl")
+    model_path = os.path.join(MODEL_DIR, artifact_name(exercise_name, version))
     joblib.dump(model_bundle, model_path)
+    exported = export_forest(model, model_path, FEATURES)
 
     # ---------------- SAVE TO DATABASE ----------------
-    AIModel.objects.filter(exercise=exercise_name).update(is_active=False)
+    if SHADOW:
+        AIModel.objects.filter(exercise=exercise_name).update(is_shadow=False)
+    else:
+        AIModel.objects.filter(exercise=exercise_name).update(is_active=False, is_shadow=False)
 
     AIModel.objects.create(
         exercise=exercise_name,
         version=version,
         description=f"{exercise_name} posture classification model (train/test fixed)",
         accuracy=float(cv_scores.mean()),
-        is_active=True
+        is_active=not SHADOW,
+        is_shadow=SHADOW,
+        artifact_path=os.path.relpath(model_path, BASE_DIR),
+        checksum=file_checksum(model_path),
+        export_checksum=file_checksum(exported)
     )
 
-    print(f"\n✅ Model saved for {exercise_name}")
+    print(f"\n✅ Model saved for {exercise_name}" + (" (shadow candidate)" if SHADOW else ""))
 
 print("\n🚀 ALL MODELS TRAINED SUCCESSFULLY!")
\ No newline at end of file